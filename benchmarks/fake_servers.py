@@ -0,0 +1,288 @@
+"""Local stand-ins for every upstream the API talks to, with configurable latency and payload size.
+
+REST fakes (OpenAI, TweetScout, GraphQL indexer, Mailtrap) share one aiohttp server; the OpenSea
+MCP fake is a FastMCP SSE server on its own port.
+
+    python benchmarks/fake_servers.py --port 9100 --mcp-port 9101 --openai-latency-ms 400
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from aiohttp import web
+from mcp.server.fastmcp import FastMCP
+
+HANDLE_WORDS = ("@", "twitter", "followers", "score")
+
+
+class FakeUpstreams:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.wallets: list[str] = []
+        self.requests: dict[str, int] = {}
+        self.openai_in_flight = 0
+
+    async def _delay(self, name: str, latency_ms: float) -> None:
+        self.requests[name] = self.requests.get(name, 0) + 1
+        if latency_ms > 0:
+            jitter = latency_ms * self.args.jitter
+            await asyncio.sleep(max(0.0, latency_ms + random.uniform(-jitter, jitter)) / 1000)
+
+    # OpenAI ---------------------------------------------------------------------------------------
+
+    async def chat_completions(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        limit = self.args.openai_max_concurrency
+        if limit and self.openai_in_flight >= limit:
+            self.requests["openai_429"] = self.requests.get("openai_429", 0) + 1
+            return web.json_response(
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                status=429, headers={"retry-after-ms": "200", **self._openai_rate_headers(0)}
+            )
+        self.openai_in_flight += 1
+        try:
+            await self._delay("openai", self.args.openai_latency_ms)
+        finally:
+            self.openai_in_flight -= 1
+        messages = body.get("messages", [])
+        last = messages[-1] if messages else {}
+        prompt_chars = sum(len(str(message.get("content") or "")) for message in messages)
+        tools = body.get("tools") or []
+        user_text = str(last.get("content") or "").lower()
+
+        message = {"role": "assistant", "content": None}
+        finish_reason = "stop"
+        tool_names = {tool["function"]["name"] for tool in tools}
+        if last.get("role") == "user" and "tweetscout_get_info" in tool_names and any(
+            word in user_text for word in HANDLE_WORDS
+        ):
+            message["tool_calls"] = [{
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+                "type": "function",
+                "function": {"name": "tweetscout_get_info", "arguments": json.dumps({"user_handle": "based"})}
+            }]
+            finish_reason = "tool_calls"
+        elif last.get("role") == "user" and "opensea_search_collections" in tool_names and "floor" in user_text:
+            message["tool_calls"] = [{
+                "id": f"call_{uuid.uuid4().hex[:12]}",
+                "type": "function",
+                "function": {"name": "opensea_search_collections", "arguments": json.dumps({"query": "azuki"})}
+            }]
+            finish_reason = "tool_calls"
+        else:
+            message["content"] = ("gm ser, here is the alpha. " * max(1, self.args.answer_chars // 27))[
+                :self.args.answer_chars
+            ]
+
+        completion_tokens = len(message["content"] or "") // 4 + 10
+        remaining = limit - self.openai_in_flight if limit else 10_000
+        return web.json_response({
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {
+                "prompt_tokens": prompt_chars // 4,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_chars // 4 + completion_tokens
+            }
+        }, headers=self._openai_rate_headers(remaining))
+
+    def _openai_rate_headers(self, remaining: int) -> dict[str, str]:
+        limit = self.args.openai_max_concurrency or 10_000
+        return {
+            "x-ratelimit-limit-requests": str(limit),
+            "x-ratelimit-remaining-requests": str(remaining),
+            "x-ratelimit-reset-requests": "200ms",
+        }
+
+    # TweetScout -----------------------------------------------------------------------------------
+
+    def _account(self, handle: str) -> dict:
+        return {
+            "id": str(abs(hash(handle)) % 10 ** 12),
+            "name": handle.title(),
+            "screen_name": handle,
+            "description": "building onchain " * 8,
+            "avatar": "https://pbs.twimg.com/profile_images/fake.jpg",
+            "banner": "https://pbs.twimg.com/profile_banners/fake.png",
+            "followers_count": random.randint(1_000, 1_000_000),
+            "friends_count": random.randint(10, 5_000),
+            "register_date": "2015-06-01T00:00:00Z",
+            "tweets_count": random.randint(100, 50_000),
+            "verified": True,
+            "can_dm": False,
+        }
+
+    async def tweetscout_info(self, request: web.Request) -> web.Response:
+        await self._delay("tweetscout", self.args.tweetscout_latency_ms)
+        return web.json_response(self._account(request.match_info["handle"]))
+
+    async def tweetscout_score(self, request: web.Request) -> web.Response:
+        await self._delay("tweetscout", self.args.tweetscout_latency_ms)
+        return web.json_response({"score": random.randint(0, 1000)})
+
+    async def tweetscout_followers_stats(self, request: web.Request) -> web.Response:
+        await self._delay("tweetscout", self.args.tweetscout_latency_ms)
+        return web.json_response({"influencers_count": 120, "projects_count": 40, "venture_capitals_count": 12})
+
+    async def tweetscout_top_followers(self, request: web.Request) -> web.Response:
+        await self._delay("tweetscout", self.args.tweetscout_latency_ms)
+        return web.json_response([
+            {**self._account(f"follower{i}"), "score": 1000 - i} for i in range(20)
+        ])
+
+    # GraphQL indexer ------------------------------------------------------------------------------
+
+    async def graphql(self, request: web.Request) -> web.Response:
+        await self._delay("indexer", self.args.indexer_latency_ms)
+        now = time.time()
+        wallets = self.wallets or [f"0x{uuid.uuid4().hex}{uuid.uuid4().hex[:8]}"]
+        deposits, spends = [], []
+        for i in range(self.args.events_per_poll):
+            wallet = wallets[i % len(wallets)]
+            timestamp = now - i * 0.001
+            if i % 2:
+                spends.append({
+                    "user": wallet, "amount": 1.0, "useType": 1, "entityId": i, "timestamp": timestamp
+                })
+            else:
+                deposits.append({
+                    "user": wallet, "token": "0x0000000000000000000000000000000000000000",
+                    "tokenAmount": 10.0, "creditsMinted": 10.0, "usdRate": 1.0, "timestamp": timestamp
+                })
+        return web.json_response({"data": {
+            "CreditSystem_CreditsUsed": spends,
+            "CreditSystem_CreditsDeposited": deposits,
+            "CreditSystem_CreditsDepositedETH": []
+        }})
+
+    async def set_wallets(self, request: web.Request) -> web.Response:
+        self.wallets = [wallet.lower() for wallet in await request.json()]
+        return web.json_response({"wallets": len(self.wallets)})
+
+    # Mailtrap -------------------------------------------------------------------------------------
+
+    async def mailtrap_send(self, request: web.Request) -> web.Response:
+        await request.read()
+        await self._delay("mailtrap", self.args.mailtrap_latency_ms)
+        return web.json_response({"success": True, "message_ids": [uuid.uuid4().hex]})
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.requests)
+
+    def rest_app(self) -> web.Application:
+        app = web.Application(client_max_size=32 * 1024 * 1024)
+        app.router.add_post("/openai/v1/chat/completions", self.chat_completions)
+        app.router.add_get("/tweetscout/v2/info/{handle}", self.tweetscout_info)
+        app.router.add_get("/tweetscout/v2/score/{handle}", self.tweetscout_score)
+        app.router.add_get("/tweetscout/v2/followers-stats", self.tweetscout_followers_stats)
+        app.router.add_get("/tweetscout/v2/top-followers/{handle}", self.tweetscout_top_followers)
+        app.router.add_post("/graphql", self.graphql)
+        app.router.add_post("/graphql/wallets", self.set_wallets)
+        app.router.add_post("/mailtrap/api/send", self.mailtrap_send)
+        app.router.add_get("/stats", self.stats)
+        return app
+
+    # OpenSea MCP ----------------------------------------------------------------------------------
+
+    def mcp_server(self) -> FastMCP:
+        mcp = FastMCP("opensea", host="127.0.0.1", port=self.args.mcp_port, log_level="WARNING")
+
+        def collection(slug: str) -> dict:
+            return {
+                "name": slug.title(), "slug": slug, "description": "fake collection " * 20,
+                "imageUrl": f"https://i.seadn.io/{slug}.png",
+                "stats": {"floorPrice": round(random.uniform(0.1, 20), 3), "volume": random.randint(10, 10_000)}
+            }
+
+        @mcp.tool()
+        async def search_collections(query: str, limit: int = 3) -> str:
+            """Search NFT collections by name."""
+            await self._delay("opensea", self.args.opensea_latency_ms)
+            return json.dumps({"collections": [collection(f"{query}-{i}") for i in range(limit)]})
+
+        @mcp.tool()
+        async def get_collection(slug: str) -> str:
+            """Get a single NFT collection."""
+            await self._delay("opensea", self.args.opensea_latency_ms)
+            return json.dumps({"collection": collection(slug)})
+
+        @mcp.tool()
+        async def get_profile(address: str, includes: list[str] | None = None) -> str:
+            """Get a wallet profile with balances and items."""
+            await self._delay("opensea", self.args.opensea_latency_ms)
+            return json.dumps({
+                "address": address,
+                "balances": [
+                    {"currency": {"symbol": symbol}, "usdValue": str(random.uniform(1, 5000))}
+                    for symbol in ("ETH", "USDC", "WETH", "APE") * max(1, self.args.profile_balances // 4)
+                ],
+                "items": {"items": [{
+                    "collection": {"name": f"Collection {i}", "slug": f"collection-{i}"},
+                    "chain": {"name": "ethereum"},
+                    "imageUrl": f"https://i.seadn.io/item-{i}.png",
+                    "tokenId": str(i)
+                } for i in range(self.args.profile_items)]}
+            })
+
+        return mcp
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--mcp-port", type=int, default=9101)
+    parser.add_argument("--jitter", type=float, default=0.2, help="relative latency jitter")
+    parser.add_argument("--openai-latency-ms", type=float, default=400)
+    parser.add_argument("--tweetscout-latency-ms", type=float, default=150)
+    parser.add_argument("--opensea-latency-ms", type=float, default=250)
+    parser.add_argument("--indexer-latency-ms", type=float, default=30)
+    parser.add_argument("--mailtrap-latency-ms", type=float, default=80)
+    parser.add_argument("--openai-max-concurrency", type=int, default=0,
+                        help="answer 429 above this many concurrent completions (0 = unlimited)")
+    parser.add_argument("--answer-chars", type=int, default=1200)
+    parser.add_argument("--events-per-poll", type=int, default=50)
+    parser.add_argument("--profile-items", type=int, default=50)
+    parser.add_argument("--profile-balances", type=int, default=12)
+    return parser.parse_args(argv)
+
+
+def upstream_env(host: str, port: int, mcp_port: int) -> dict[str, str]:
+    base = f"http://{host}:{port}"
+    return {
+        "OPENAI_BASE_URL": f"{base}/openai/v1",
+        "OPENAI_API_KEY": "fake",
+        "TWEETSCOUT_BASE_URL": f"{base}/tweetscout/v2",
+        "TWEETSCOUT_API_KEY": "fake",
+        "GRAPHQL_ENDPOINT": f"{base}/graphql",
+        "MAILTRAP_API_URL": f"{base}/mailtrap/api/send",
+        "MAILTRAP_API_TOKEN": "fake",
+        "OPENSEA_MCP_URL": f"http://{host}:{mcp_port}/sse",
+        "OPENSEA_BEARER_TOKEN": "fake",
+    }
+
+
+async def serve(args: argparse.Namespace) -> None:
+    upstreams = FakeUpstreams(args)
+    runner = web.AppRunner(upstreams.rest_app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, args.host, args.port).start()
+    mcp_config = uvicorn.Config(
+        upstreams.mcp_server().sse_app(), host=args.host, port=args.mcp_port, log_level="warning"
+    )
+    print(json.dumps(upstream_env(args.host, args.port, args.mcp_port)), flush=True)
+    try:
+        await uvicorn.Server(mcp_config).serve()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve(parse_args()))
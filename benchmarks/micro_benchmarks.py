@@ -0,0 +1,218 @@
+"""Micro-benchmarks for the pure per-request/per-event functions, with a baseline regression gate.
+
+    python benchmarks/micro_benchmarks.py                      # print timings
+    python benchmarks/micro_benchmarks.py --save-baseline      # record benchmarks/micro_baseline.json
+    python benchmarks/micro_benchmarks.py --check              # exit 1 if any benchmark regressed
+
+Baselines are machine specific, so the file is not committed: record one with --save-baseline on the
+machine that runs the gate before using --check.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from run_scenarios import ensure_jwt_keys
+
+ensure_jwt_keys()
+
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from fastapi.encoders import jsonable_encoder
+
+from clients import RedisClient
+from constants import SIGN_MESSAGE
+from dto import (
+    ChatEntity, CreditsDeposited, CreditsDepositedETH, CreditsUsed, GraphQLResponse,
+    IndexerConverter, MessageEntity
+)
+from enums import MessageRole
+from utils.jwt_utils import create_access_token, decode_jwt
+from utils.portfolio_utils import _parse_nfts, json_to_user_profile
+from utils.wallet_utils import verify_signature
+
+BASELINE_PATH = Path(__file__).resolve().parent / "micro_baseline.json"
+NOW = datetime(2025, 1, 1, 12, 0, 0)
+
+
+class _CachedHistory:
+    # stands in for the Redis connection so only the parsing in get_chat_message_entities is timed
+    def __init__(self, payloads: list[str]):
+        self.payloads = payloads
+
+    async def lrange(self, key: str, start: int, end: int) -> list[str]:
+        return self.payloads
+
+
+def _cached_messages(count: int = 20) -> list[str]:
+    return [json.dumps({
+        "id": i,
+        "content": "floor is 4.2 eth, volume up 18% on the week, top holders unchanged. " * 8,
+        "role": "user" if i % 2 else "assistant",
+        "chat_id": 1,
+        "created_at": (NOW + timedelta(seconds=i)).isoformat()
+    }) for i in range(count)]
+
+
+def _opensea_profile(items: int = 50, balances: int = 12) -> dict:
+    return {
+        "address": "0x" + "ab" * 20,
+        "balances": [
+            {"currency": {"symbol": symbol, "name": symbol}, "usdValue": str(100.5 + i), "quantity": "1.0"}
+            for i, symbol in enumerate(("ETH", "USDC", "WETH", "APE") * (balances // 4))
+        ],
+        "items": {"items": [{
+            "collection": {"name": f"Collection {i}", "slug": f"collection-{i}", "imageUrl": "https://i.seadn.io/c.png"},
+            "chain": {"name": "ethereum", "identifier": "ethereum"},
+            "imageUrl": f"https://i.seadn.io/item-{i}.png",
+            "tokenId": str(i),
+            "name": f"Item #{i}",
+            "rarity": {"rank": i}
+        } for i in range(items)]},
+        "activity": [{"type": "sale", "price": "1.0"} for _ in range(20)],
+    }
+
+
+def _graphql_response(events: int = 50) -> GraphQLResponse:
+    wallet = "0x" + "Cd" * 20
+    return GraphQLResponse(
+        CreditSystem_CreditsUsed=[
+            CreditsUsed(user=wallet, amount=1.5, useType=1, entityId=i, timestamp=1_700_000_000 + i)
+            for i in range(events)
+        ],
+        CreditSystem_CreditsDeposited=[
+            CreditsDeposited(
+                user=wallet, token="0xA0b86a33E6441c8C06DDD46f4811c4Cd98229B97", tokenAmount=100.0,
+                creditsMinted=100.0, usdRate=1.0, timestamp=1_700_000_000 + i
+            ) for i in range(events)
+        ],
+        CreditSystem_CreditsDepositedETH=[
+            CreditsDepositedETH(
+                user=wallet, ethAmount=0.05, creditsMinted=150.0, ethUsdRate=3000.0, timestamp=1_700_000_000 + i
+            ) for i in range(events)
+        ],
+    )
+
+
+def build_benchmarks() -> dict:
+    token = create_access_token(user_id=42, wallet_address="0x" + "ab" * 20)
+
+    account = Account.create()
+    signature = Account.sign_message(encode_defunct(text=SIGN_MESSAGE), account.key).signature.hex()
+    signature = signature if signature.startswith("0x") else f"0x{signature}"
+    address = account.address.lower()
+
+    redis_client = RedisClient.__new__(RedisClient)
+    redis_client._redis = _CachedHistory(_cached_messages())
+
+    profile = _opensea_profile()
+    graphql_response = _graphql_response()
+
+    messages = [
+        MessageEntity(id=i, content="gm " * 200, role=MessageRole.AI, chat_id=1, created_at=NOW)
+        for i in range(50)
+    ]
+    chats = [ChatEntity(id=i, user_id=1, title=f"Chat {i}", created_at=NOW) for i in range(50)]
+
+    def convert_indexer_events():
+        for used in graphql_response.CreditSystem_CreditsUsed:
+            IndexerConverter.from_credits_used_to_spend_event(used)
+        for deposit in graphql_response.CreditSystem_CreditsDeposited:
+            IndexerConverter.from_deposited_to_deposit_event(deposit)
+        for deposit in graphql_response.CreditSystem_CreditsDepositedETH:
+            IndexerConverter.from_deposited_eth_to_deposit_event(deposit)
+
+    return {
+        "decode_jwt": lambda: decode_jwt(token),
+        "verify_signature": lambda: verify_signature(address, SIGN_MESSAGE, signature),
+        "get_chat_message_entities_20": lambda: redis_client.get_chat_message_entities(1),
+        "json_to_user_profile_50_items": lambda: json_to_user_profile(profile),
+        "parse_nfts_50_items": lambda: _parse_nfts(profile),
+        "indexer_converter_150_events": convert_indexer_events,
+        "jsonable_encoder_50_messages": lambda: jsonable_encoder(messages, exclude_none=True),
+        "jsonable_encoder_50_chats": lambda: jsonable_encoder(chats, exclude_none=True),
+    }
+
+
+def measure(func, min_time: float, rounds: int) -> dict:
+    is_async = asyncio.iscoroutine(probe := func())
+    if is_async:
+        probe.close()
+        loop = asyncio.new_event_loop()
+
+        async def run_batch(iterations: int):
+            for _ in range(iterations):
+                await func()
+
+        def batch(iterations: int):
+            loop.run_until_complete(run_batch(iterations))
+    else:
+        def batch(iterations: int):
+            for _ in range(iterations):
+                func()
+
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        batch(iterations)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / rounds or iterations >= 1_000_000:
+            break
+        iterations *= 2
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        batch(iterations)
+        timings.append((time.perf_counter() - start) / iterations)
+    if is_async:
+        loop.close()
+    return {
+        "min_us": round(min(timings) * 1e6, 3),
+        "median_us": round(statistics.median(timings) * 1e6, 3),
+        "iterations": iterations,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this string")
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds spent per benchmark")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="compare against the baseline and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before --check fails")
+    args = parser.parse_args()
+
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    if args.check and not baseline:
+        print(f"no baseline at {BASELINE_PATH}: record one on this machine with --save-baseline", file=sys.stderr)
+        return 2
+    results, regressions = {}, []
+    for name, func in build_benchmarks().items():
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = measure(func, args.min_time, args.rounds)
+        line = f"{name:<34} min {results[name]['min_us']:>12.3f} us   median {results[name]['median_us']:>12.3f} us"
+        if name in baseline:
+            change = results[name]["min_us"] / baseline[name]["min_us"] - 1
+            line += f"   {change:+.1%} vs baseline"
+            if change > args.tolerance:
+                regressions.append(name)
+        print(line)
+
+    if args.save_baseline:
+        BASELINE_PATH.write_text(json.dumps({**baseline, **results}, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {BASELINE_PATH}")
+    if args.check and regressions:
+        print(f"regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+"""Scripted load scenarios against the FastAPI app with every external API replaced by local fakes.
+
+Postgres and Redis are real (they are what we want to count round trips against):
+
+    docker compose up -d postgres redis && alembic upgrade head
+    python benchmarks/run_scenarios.py --users 50 --concurrency 20 --openai-latency-ms 400
+
+Unknown options are forwarded to fake_servers.py, so every upstream latency and payload knob is
+available here. The app runs in-process behind httpx's ASGI transport; its lifespan is started
+once and shared by all scenarios.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARKS_DIR.parent / "src" / "main"))
+
+import httpx
+from eth_account import Account
+from eth_account.messages import encode_defunct
+from redis.asyncio.client import Pipeline, Redis
+from sqlalchemy import event
+
+SCENARIOS = ("auth_storm", "chat_burst", "history_paging", "event_burst", "portfolio_views")
+CHAT_PROMPTS = (
+    "what is a merkle tree?",
+    "how influential is @based on twitter?",
+    "what is the azuki floor price today?",
+)
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    wall_seconds: float = 0.0
+    db_round_trips: int = 0
+    redis_round_trips: int = 0
+    max_rss_mb: float = 0.0
+    traced_peak_mb: float | None = None
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+        requests = len(latencies)
+        return {
+            "scenario": self.name,
+            "requests": requests,
+            "errors": self.errors,
+            "rps": round(requests / self.wall_seconds, 2) if self.wall_seconds else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "db_per_request": round(self.db_round_trips / requests, 2) if requests else 0.0,
+            "redis_per_request": round(self.redis_round_trips / requests, 2) if requests else 0.0,
+            "max_rss_mb": round(self.max_rss_mb, 1),
+            "traced_peak_mb": round(self.traced_peak_mb, 1) if self.traced_peak_mb is not None else None,
+        }
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class RoundTripCounter:
+    def __init__(self):
+        self.db = 0
+        self.redis = 0
+
+    def install(self, engine) -> None:
+        event.listen(engine.sync_engine, "before_cursor_execute", self._count_db)
+        counter = self
+        execute_command = Redis.execute_command
+        execute_pipeline = Pipeline.execute
+
+        async def counted_execute_command(self, *args, **kwargs):
+            counter.redis += 1
+            return await execute_command(self, *args, **kwargs)
+
+        async def counted_execute_pipeline(self, *args, **kwargs):
+            counter.redis += 1
+            return await execute_pipeline(self, *args, **kwargs)
+
+        Redis.execute_command = counted_execute_command
+        Pipeline.execute = counted_execute_pipeline
+
+    def _count_db(self, *args) -> None:
+        self.db += 1
+
+
+@dataclass
+class BenchUser:
+    account: object
+    token: str | None = None
+    user_id: int | None = None
+    chat_id: int | None = None
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+class Bench:
+    def __init__(self, client: httpx.AsyncClient, counter: RoundTripCounter, args: argparse.Namespace):
+        self.client = client
+        self.counter = counter
+        self.args = args
+        self.users = [BenchUser(Account.create()) for _ in range(args.users)]
+
+    async def measure(self, name: str, calls) -> ScenarioResult:
+        result = ScenarioResult(name)
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+        db_before, redis_before = self.counter.db, self.counter.redis
+        if self.args.tracemalloc:
+            tracemalloc.start()
+
+        async def run(call):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    outcome = await call()
+                except Exception as e:
+                    print(f"{name}: {type(e).__name__}: {e}", file=sys.stderr)
+                    outcome = False
+                # a call either is one request (bool) or a session that timed its own requests
+                samples = outcome if isinstance(outcome, list) else [(time.perf_counter() - start, outcome)]
+                for latency, ok in samples:
+                    result.latencies.append(latency)
+                    if not ok:
+                        result.errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run(call) for call in calls))
+        result.wall_seconds = time.perf_counter() - started
+        result.db_round_trips = self.counter.db - db_before
+        result.redis_round_trips = self.counter.redis - redis_before
+        result.max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        if self.args.tracemalloc:
+            result.traced_peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            tracemalloc.stop()
+        return result
+
+    async def request(self, method: str, url: str, user: BenchUser | None = None, **kwargs) -> httpx.Response:
+        if user is not None:
+            kwargs["headers"] = user.headers
+        return await self.client.request(method, url, **kwargs)
+
+    # scenarios ------------------------------------------------------------------------------------
+
+    async def auth_storm(self) -> ScenarioResult:
+        message = (await self.request("GET", "/auth/message")).json()["message"]
+
+        def login(user: BenchUser):
+            async def call():
+                signature = Account.sign_message(encode_defunct(text=message), user.account.key).signature.hex()
+                # lowercase like the indexer reports wallets, so event_burst finds the user's events
+                response = await self.request("POST", "/auth/authenticate", json={
+                    "wallet_address": user.account.address.lower(),
+                    "signature": signature if signature.startswith("0x") else f"0x{signature}"
+                })
+                if response.status_code == 200:
+                    user.token = response.json()["access_token"]
+                return response.status_code == 200
+            return call
+
+        return await self.measure("auth_storm", [login(user) for user in self.users])
+
+    async def chat_burst(self) -> ScenarioResult:
+        def conversation(user: BenchUser):
+            async def call():
+                # messages in one chat are serialized by the chat lease, so each user talks in turn
+                samples = []
+                for i in range(self.args.messages):
+                    start = time.perf_counter()
+                    response = await self.request(
+                        "POST", f"/chat/{user.chat_id}/message/new", user,
+                        json={"content": CHAT_PROMPTS[i % len(CHAT_PROMPTS)]}
+                    )
+                    samples.append((time.perf_counter() - start, response.status_code == 200))
+                return samples
+            return call
+
+        return await self.measure("chat_burst", [conversation(user) for user in self.users])
+
+    async def history_paging(self) -> ScenarioResult:
+        def page(user: BenchUser, offset: int):
+            async def call():
+                response = await self.request(
+                    "GET", f"/chat/{user.chat_id}/messages", user, params={"limit": 20, "offset": offset}
+                )
+                return response.status_code == 200
+            return call
+
+        offsets = range(0, self.args.history_messages, 20)
+        return await self.measure("history_paging", [page(user, offset) for user in self.users for offset in offsets])
+
+    async def event_burst(self, fake_base_url: str) -> ScenarioResult:
+        from services import IndexerService
+
+        async with httpx.AsyncClient() as fake_client:
+            await fake_client.post(
+                f"{fake_base_url}/graphql/wallets", json=[user.account.address.lower() for user in self.users]
+            )
+        indexer_service = IndexerService.get_instance()
+
+        async def poll_indexer():
+            await indexer_service._process_indexer_data()
+            return True
+
+        def poll_events(user: BenchUser):
+            async def call():
+                response = await self.request("GET", "/events/all", user)
+                return response.status_code == 200
+            return call
+
+        calls = []
+        for _ in range(self.args.event_polls):
+            calls.append(poll_indexer)
+            calls.extend(poll_events(user) for user in self.users)
+        return await self.measure("event_burst", calls)
+
+    async def portfolio_views(self) -> ScenarioResult:
+        def view(user: BenchUser):
+            async def call():
+                response = await self.request("GET", "/user/portfolio", user)
+                return response.status_code == 200
+            return call
+
+        return await self.measure("portfolio_views", [view(user) for user in self.users])
+
+    # fixtures -------------------------------------------------------------------------------------
+
+    async def prepare_users(self) -> None:
+        from services import ChatService, UserService
+        from utils.jwt_utils import decode_jwt
+
+        if any(user.token is None for user in self.users):
+            await self.auth_storm()
+        chat_service = ChatService.get_instance()
+        for user in self.users:
+            user.user_id = decode_jwt(user.token)["sub"]
+            await UserService.get_instance().update_balance_by_id(user.user_id, self.args.messages * 10.0)
+            if user.chat_id is None:
+                user.chat_id = (await chat_service.create(user.user_id)).id
+
+    async def seed_history(self) -> None:
+        from dto import MessageEntity
+        from enums import MessageRole
+        from services import ChatService
+
+        message_dao = ChatService.get_instance().message_dao
+        for user in self.users:
+            for i in range(self.args.history_messages):
+                await message_dao.create(MessageEntity(
+                    content=f"seeded message {i} " * 10,
+                    role=MessageRole.USER if i % 2 == 0 else MessageRole.AI,
+                    chat_id=user.chat_id
+                ))
+
+
+def ensure_jwt_keys() -> None:
+    if os.getenv("JWT_PRIVATE_KEY_PATH") and os.getenv("JWT_PUBLIC_KEY_PATH"):
+        return
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    key_dir = Path(tempfile.mkdtemp(prefix="bench-keys-"))
+    (key_dir / "private.pem").write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+    (key_dir / "public.pem").write_bytes(key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ))
+    os.environ["JWT_PRIVATE_KEY_PATH"] = str(key_dir / "private.pem")
+    os.environ["JWT_PUBLIC_KEY_PATH"] = str(key_dir / "public.pem")
+    os.environ.setdefault("JWT_ALGORITHM", "RS256")
+
+
+def start_fakes(fake_argv: list[str]) -> tuple[subprocess.Popen, dict[str, str]]:
+    process = subprocess.Popen(
+        [sys.executable, str(BENCHMARKS_DIR / "fake_servers.py"), *fake_argv],
+        stdout=subprocess.PIPE, text=True
+    )
+    upstream_env = json.loads(process.stdout.readline())
+    return process, upstream_env
+
+
+def print_report(results: list[ScenarioResult]) -> None:
+    rows = [result.summary() for result in results]
+    columns = list(rows[0].keys()) if rows else []
+    widths = {column: max(len(column), *(len(str(row[column])) for row in rows)) for column in columns}
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    for row in rows:
+        print("  ".join(str(row[column]).ljust(widths[column]) for column in columns))
+
+
+async def main(args: argparse.Namespace, fake_argv: list[str]) -> list[ScenarioResult]:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    ensure_jwt_keys()
+    fakes, upstream_env = start_fakes(fake_argv)
+    os.environ.update(upstream_env)
+    os.environ["INDEXER_EMBEDDED"] = "false"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # every simulated user shares one client address, so the per-IP auth limit would throttle auth_storm
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    # give the fake MCP server a moment to bind before the first tool listing
+    await asyncio.sleep(1)
+
+    from main import app
+    from utils import start_utils
+
+    results = []
+    try:
+        async with app.router.lifespan_context(app):
+            counter = RoundTripCounter()
+            counter.install(start_utils._db_helper._engine)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+                bench = Bench(client, counter, args)
+                selected = SCENARIOS if "all" in args.scenario else args.scenario
+                if "auth_storm" in selected:
+                    results.append(await bench.auth_storm())
+                await bench.prepare_users()
+                for name in selected:
+                    if name == "auth_storm":
+                        continue
+                    if name == "history_paging":
+                        await bench.seed_history()
+                    if name == "event_burst":
+                        results.append(await bench.event_burst(upstream_env["GRAPHQL_ENDPOINT"]))
+                    else:
+                        results.append(await getattr(bench, name)())
+    finally:
+        fakes.terminate()
+        fakes.wait()
+    return results
+
+
+def parse_args() -> tuple[argparse.Namespace, list[str]]:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", nargs="+", default=["all"], choices=("all", *SCENARIOS))
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=3, help="messages per user in chat_burst")
+    parser.add_argument("--history-messages", type=int, default=100, help="seeded messages per chat")
+    parser.add_argument("--event-polls", type=int, default=5, help="indexer polls in event_burst")
+    parser.add_argument("--tracemalloc", action="store_true", help="report traced peak memory (slow)")
+    parser.add_argument("--json", help="write the summary to this file")
+    return parser.parse_known_args()
+
+
+if __name__ == "__main__":
+    cli_args, fake_server_argv = parse_args()
+    scenario_results = asyncio.run(main(cli_args, fake_server_argv))
+    print_report(scenario_results)
+    if cli_args.json:
+        Path(cli_args.json).write_text(json.dumps([result.summary() for result in scenario_results], indent=2))
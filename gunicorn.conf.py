@@ -0,0 +1,29 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+pythonpath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "main")
+wsgi_app = "main:app"
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = f"{os.getenv('APP_HOST', '0.0.0.0')}:{os.getenv('APP_PORT', 8000)}"
+workers = int(os.getenv("APP_WORKERS", 1))
+graceful_timeout = 30
+timeout = 120
+keepalive = 5
+
+
+def on_starting(server):
+    # prometheus_client multiprocess mode keeps per-worker files that must not survive a restart
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for name in os.listdir(multiproc_dir):
+            os.remove(os.path.join(multiproc_dir, name))
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
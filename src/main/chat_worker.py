@@ -0,0 +1,29 @@
+import asyncio
+import multiprocessing
+import os
+import sys
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from dotenv import load_dotenv
+
+from utils.start_utils import run_chat_worker
+
+
+def _worker_process():
+    asyncio.run(run_chat_worker())
+
+
+if __name__ == '__main__':
+    load_dotenv()
+    processes = int(os.getenv("CHAT_WORKER_PROCESSES", 1))
+    if processes == 1:
+        _worker_process()
+    else:
+        workers = [multiprocessing.Process(target=_worker_process) for _ in range(processes)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
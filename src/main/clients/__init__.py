@@ -3,3 +3,7 @@ from .mcp_client import MCPClient
 from .llm_client import LLMClient
 from .redis_client import RedisClient
 from .email_client import EmailClient
+from .upstream_limiter import UpstreamLimiter
+from .tool_memory import ToolMemory
+from .openai_governor import OpenAIGovernor
+from .circuit_breaker import CircuitBreaker
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from constants import (
+    CIRCUIT_BREAKER_WINDOW_SIZE, CIRCUIT_BREAKER_MIN_CALLS, CIRCUIT_BREAKER_FAILURE_RATE,
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS, CIRCUIT_BREAKER_OPEN_SECONDS, CIRCUIT_BREAKER_MAX_OPEN_SECONDS,
+    CIRCUIT_BREAKER_HALF_OPEN_PROBES, PROVIDER_BULKHEADS, DEFAULT_PROVIDER_BULKHEAD
+)
+from enums import CircuitState
+from exceptions import CircuitOpenError, BulkheadFullError
+from utils.metrics import set_circuit_state, observe_circuit_rejection
+
+logger = logging.getLogger(__name__)
+
+_STATE_VALUES = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+
+class CircuitBreaker:
+    # provider name -> breaker, shared by every client in the process
+    _breakers: dict[str, "CircuitBreaker"] = {}
+
+    def __init__(self, name: str, max_concurrency: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.min_calls = int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", CIRCUIT_BREAKER_MIN_CALLS))
+        self.failure_rate = float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", CIRCUIT_BREAKER_FAILURE_RATE))
+        self.slow_call_seconds = float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_SECONDS", CIRCUIT_BREAKER_SLOW_CALL_SECONDS))
+        self.base_open_seconds = float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", CIRCUIT_BREAKER_OPEN_SECONDS))
+        self.state = CircuitState.CLOSED
+        self.open_seconds = self.base_open_seconds
+        self.opened_at = 0.0
+        self.in_flight = 0
+        self._probes = 0
+        self._outcomes: deque[bool] = deque(
+            maxlen=int(os.getenv("CIRCUIT_BREAKER_WINDOW_SIZE", CIRCUIT_BREAKER_WINDOW_SIZE))
+        )
+
+    @classmethod
+    def for_provider(cls, name: str) -> "CircuitBreaker":
+        breaker = cls._breakers.get(name)
+        if breaker is None:
+            breaker = cls._breakers[name] = cls(name, PROVIDER_BULKHEADS.get(name, DEFAULT_PROVIDER_BULKHEAD))
+        return breaker
+
+    def is_available(self) -> bool:
+        # an open circuit becomes available again once its probe may be sent
+        if self.state == CircuitState.OPEN:
+            return time.monotonic() >= self.opened_at + self.open_seconds
+        if self.state == CircuitState.HALF_OPEN:
+            return self._probes < CIRCUIT_BREAKER_HALF_OPEN_PROBES
+        return True
+
+    @asynccontextmanager
+    async def call(self):
+        probe = self._admit()
+        self.in_flight += 1
+        start = time.monotonic()
+        recorded = False
+        try:
+            yield
+            recorded = True
+            self._record(time.monotonic() - start < self.slow_call_seconds, probe)
+        except asyncio.CancelledError:
+            # a caller running out of budget says nothing about the provider unless the call was already slow
+            if time.monotonic() - start >= self.slow_call_seconds:
+                recorded = True
+                self._record(False, probe)
+            raise
+        except Exception:
+            recorded = True
+            self._record(False, probe)
+            raise
+        finally:
+            self.in_flight -= 1
+            # an unrecorded call still has to give its probe slot back
+            if probe and not recorded:
+                self._probes = max(self._probes - 1, 0)
+
+    def _admit(self) -> bool:
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() < self.opened_at + self.open_seconds:
+                observe_circuit_rejection(self.name, "open")
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            self._transition(CircuitState.HALF_OPEN)
+        if self.in_flight >= self.max_concurrency:
+            observe_circuit_rejection(self.name, "bulkhead")
+            raise BulkheadFullError(f"{self.name} has {self.in_flight} calls in flight")
+        if self.state == CircuitState.HALF_OPEN:
+            if self._probes >= CIRCUIT_BREAKER_HALF_OPEN_PROBES:
+                observe_circuit_rejection(self.name, "half_open")
+                raise CircuitOpenError(f"{self.name} circuit is waiting for a probe")
+            self._probes += 1
+            return True
+        return False
+
+    def _record(self, success: bool, probe: bool) -> None:
+        if probe:
+            self._probes = max(self._probes - 1, 0)
+            if self.state != CircuitState.HALF_OPEN:
+                return
+            if success:
+                self.open_seconds = self.base_open_seconds
+                self._transition(CircuitState.CLOSED)
+            else:
+                self.open_seconds = min(self.open_seconds * 2, CIRCUIT_BREAKER_MAX_OPEN_SECONDS)
+                self._transition(CircuitState.OPEN)
+            return
+        # calls admitted before the circuit tripped finish after it; only closed circuits count outcomes
+        if self.state != CircuitState.CLOSED:
+            return
+        self._outcomes.append(success)
+        failures = self._outcomes.count(False)
+        if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+            self._transition(CircuitState.OPEN)
+
+    def _transition(self, state: CircuitState) -> None:
+        if state == CircuitState.OPEN:
+            self.opened_at = time.monotonic()
+            logger.warning("%s circuit opened for %.0fs", self.name, self.open_seconds)
+        elif state == CircuitState.CLOSED:
+            logger.info("%s circuit closed", self.name)
+        self._outcomes.clear()
+        self._probes = 0
+        self.state = state
+        set_circuit_state(self.name, _STATE_VALUES[state])
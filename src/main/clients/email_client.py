@@ -8,7 +8,7 @@ class EmailClient:
         self.api_token = os.getenv("MAILTRAP_API_TOKEN")
         self.from_email = os.getenv("EMAIL_FROM_ADDRESS", "hello@basedagent.io")
         self.from_name = os.getenv("EMAIL_FROM_NAME", "ChatPlatform")
-        self.api_url = "https://send.api.mailtrap.io/api/send"
+        self.api_url = os.getenv("MAILTRAP_API_URL", "https://send.api.mailtrap.io/api/send")
 
     def _validate_config(self):
         if not self.api_token:
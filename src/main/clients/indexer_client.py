@@ -2,8 +2,9 @@ import os
 
 import aiohttp
 
+from .circuit_breaker import CircuitBreaker
 from dto import GraphQLResponse
-from exceptions import IndexerConnectionError, IndexerQueryError
+from exceptions import IndexerConnectionError, IndexerQueryError, UpstreamUnavailableError
 
 
 class IndexerClient:
@@ -11,19 +12,23 @@ class IndexerClient:
     def __init__(self):
         self.endpoint = os.getenv("GRAPHQL_ENDPOINT")
         self.session: aiohttp.ClientSession | None = None
+        self.breaker = CircuitBreaker.for_provider("indexer")
     
     async def _make_graphql_request(self, query: str, variables: dict) -> dict:
         if not self.session:
             self.session = aiohttp.ClientSession()
         
         try:
-            async with self.session.post(
-                self.endpoint,
-                json={"query": query, "variables": variables},
-                timeout=aiohttp.ClientTimeout(total=2)
-            ) as response:
-                response.raise_for_status()
-                return await response.json()
+            async with self.breaker.call():
+                async with self.session.post(
+                    self.endpoint,
+                    json={"query": query, "variables": variables},
+                    timeout=aiohttp.ClientTimeout(total=2)
+                ) as response:
+                    response.raise_for_status()
+                    return await response.json()
+        except UpstreamUnavailableError as e:
+            raise IndexerConnectionError(f"GraphQL endpoint unavailable: {str(e)}")
         except aiohttp.ClientError as e:
             raise IndexerConnectionError(f"Failed to connect to GraphQL endpoint: {str(e)}")
         except Exception as e:
@@ -1,35 +1,61 @@
+import asyncio
 import json
-import os
-import openai
+import logging
+import re
 from openai.types.chat import ChatCompletion
 
 from .redis_client import RedisClient
-from .mcp_client import MCPClient
-from constants import MODEL, MULTICALL_DEPTH, MASTER_PROMPT, CASE_PROMPT, \
-    GENERATE_CHAT_TITLE_PROMPT
-from exceptions import LLMClientError
+from .mcp_client import MCPClient, estimate_tokens, compact_tool_result, extract_prefetch_calls
+from .upstream_limiter import UpstreamLimiter
+from .openai_governor import OpenAIGovernor
+from constants import MODEL, MULTICALL_DEPTH, MASTER_PROMPT, CASE_PROMPT, PROMPT_MAP, \
+    GENERATE_CHAT_TITLE_PROMPT, TOOL_ROUTING_KEYWORDS, TOOL_ROUTING_FOLLOW_UP_WORDS, OPENAI_PRIORITIES, \
+    CHAT_RESPONSE_DEADLINE_SECONDS, FINAL_SYNTHESIS_RESERVE_SECONDS, MIN_TOOL_ROUND_SECONDS, \
+    LLM_ROUND_BUDGET_SHARE, MIN_TOOL_TIMEOUT_SECONDS, DEADLINE_SYNTHESIS_PROMPT, NO_RESPONSE_MESSAGE
+from exceptions import LLMClientError, UpstreamRateLimitError
+from utils.deadline_utils import Deadline
+from utils.metrics import span, observe_llm_usage
+
+logger = logging.getLogger(__name__)
+
+_TOOL_ENTITY_PATTERN = re.compile(r"0x[0-9a-fA-F]{6,}|@\w{2,}|x\.com/|twitter\.com/|opensea\.io/")
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
 
 
 class LLMClient:
     def __init__(self, 
                  mcp_client: MCPClient,
                  chat_id: int,
-                 redis_client: RedisClient):
-        self.openai_client = openai.AsyncOpenAI(
-            api_key=os.getenv("OPENAI_API_KEY")
-        )
+                 redis_client: RedisClient,
+                 limiter: UpstreamLimiter | None = None):
+        self.openai = OpenAIGovernor.get_instance()
         self.chat_id = chat_id
         self.mcp_client = mcp_client
         self.redis_client = redis_client
+        self.limiter = limiter
+        self.route: str | None = None
+        self.partial = False
+        # turn stats are collected in memory and written once when the turn ends
+        self._stats: dict[str, dict[str, float]] = {}
 
     async def get_ai_response(self, 
-                              user_message: str, 
-                              prompt_index: int = None) -> str:
+                              user_message: str,
+                              task_name: str = None,
+                              deadline: Deadline | None = None) -> str:
+        try:
+            return await self._get_ai_response(user_message, task_name, deadline)
+        finally:
+            await self._flush_stats()
+
+    async def _get_ai_response(self, user_message: str, task_name: str | None, deadline: Deadline | None) -> str:
+        deadline = deadline or Deadline(CHAT_RESPONSE_DEADLINE_SECONDS)
+        prompt_index = PROMPT_MAP.get(task_name)
         system_prompt = MASTER_PROMPT
         if prompt_index is not None:
             system_prompt += CASE_PROMPT.format(task_number=prompt_index)
         
-        chat_history = await self._get_chat_history()
+        with span("llm", "history"):
+            chat_history, known_facts = await asyncio.gather(self._get_chat_history(), self._get_known_facts())
         
         messages = []
 
@@ -39,48 +65,160 @@ class LLMClient:
             "role": "system",
             "content": system_prompt
         })
+        if known_facts:
+            messages.append({
+                "role": "system",
+                "content": known_facts
+            })
         messages.append({
             "role": "user",
             "content": user_message
         })
 
+        if not self._needs_tools(user_message, prompt_index, chat_history):
+            with span("llm", "round", route="direct"):
+                response = await self._make_ai_request(messages, timeout=deadline.remaining())
+            self._record_routing("direct", rounds=1, prompt_tokens=self._prompt_tokens(response))
+            return response.choices[0].message.content or NO_RESPONSE_MESSAGE
+
+        with span("llm", "mcp_init"):
+            await self.mcp_client.setup_default_providers()
+        task_tools = self.mcp_client.get_tools_for_task(task_name)
+        # predictable first-round calls run while the model plans them
+        self.mcp_client.start_prefetch(
+            extract_prefetch_calls(user_message, task_tools),
+            max(MIN_TOOL_TIMEOUT_SECONDS, deadline.remaining() - FINAL_SYNTHESIS_RESERVE_SECONDS)
+        )
+        try:
+            return await self._run_tool_rounds(messages, task_tools, deadline)
+        finally:
+            self.mcp_client.cancel_prefetches()
+
+    async def _run_tool_rounds(self, messages: list[dict], task_tools: list[dict], deadline: Deadline) -> str:
+        task_tool_tokens = estimate_tokens(task_tools)
+        prompt_tokens = 0
+        forced = False
         for i in range(MULTICALL_DEPTH):
             if i == MULTICALL_DEPTH - 1:
-                tools = None
-            else:
-                tools = self.mcp_client.get_all_tools()
-            response = await self._make_ai_request(messages, tools)
-            print(f"AI Response {i}: {response.choices[0].message}")
+                break
+            round_budget = deadline.remaining() - FINAL_SYNTHESIS_RESERVE_SECONDS
+            if round_budget < MIN_TOOL_ROUND_SECONDS:
+                forced = True
+                break
+            self._record_tool_schema_savings(task_tool_tokens)
+            try:
+                with span("llm", "round", route="tools", round=i):
+                    response = await self._make_ai_request(
+                        messages, task_tools, timeout=round_budget * LLM_ROUND_BUDGET_SHARE
+                    )
+            except asyncio.TimeoutError:
+                logger.warning("Tool round %s for chat %s ran out of time, answering with gathered data", i, self.chat_id)
+                forced = True
+                break
+            prompt_tokens += self._prompt_tokens(response)
+            logger.debug("AI response round %s for chat %s: %s", i, self.chat_id, response.choices[0].message)
             message = response.choices[0].message
-            if message.tool_calls:
-                tool_results = []
-                for tool_call in message.tool_calls:
-                    tool_name = tool_call.function.name
-                    tool_args = json.loads(tool_call.function.arguments)
-                    tool_result = await self.mcp_client.execute_tool(tool_name, tool_args)
-                    tool_results.append(f"Tool: {tool_name} Result: {tool_result}")
-        
+            if not message.tool_calls:
+                self._record_routing("tools", rounds=i + 1, prompt_tokens=prompt_tokens)
+                return message.content or NO_RESPONSE_MESSAGE
+
+            tool_results = []
+            raw_result_tokens = 0
+            for index, tool_call in enumerate(message.tool_calls):
+                tool_name = tool_call.function.name
+                tool_args = json.loads(tool_call.function.arguments)
+                # calls still to run split what is left before the synthesis reserve
+                tool_timeout = max(
+                    MIN_TOOL_TIMEOUT_SECONDS,
+                    (deadline.remaining() - FINAL_SYNTHESIS_RESERVE_SECONDS) / (len(message.tool_calls) - index)
+                )
+                tool_result = await self.mcp_client.execute_tool(tool_name, tool_args, timeout=tool_timeout)
+                raw_result_tokens += len(str(tool_result)) // 4
+                tool_results.append(f"Tool: {tool_name} Result: {compact_tool_result(tool_name, tool_result)}")
+            self._record_tool_result_compaction(
+                len(tool_results), raw_result_tokens, sum(len(result) // 4 for result in tool_results)
+            )
+
+            messages.append({
+                "role": "assistant",
+                "content": message.content or "",
+                "tool_calls": [{
+                    "id": tc.id,
+                    "type": tc.type,
+                    "function": {
+                        "name": tc.function.name,
+                        "arguments": tc.function.arguments
+                    }
+                } for tc in message.tool_calls]
+            })
+            for tool_call, tool_result in zip(message.tool_calls, tool_results):
                 messages.append({
-                    "role": "assistant",
-                    "content": message.content or "",
-                    "tool_calls": [{
-                        "id": tc.id, 
-                        "type": tc.type, 
-                        "function": {
-                            "name": tc.function.name, 
-                            "arguments": tc.function.arguments
-                        }
-                    } for tc in message.tool_calls]
+                    "role": "tool",
+                    "tool_call_id": tool_call.id,
+                    "content": tool_result
                 })
-                for i, tool_call in enumerate(message.tool_calls):
-                    messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": tool_results[i]
-                        if i < len(tool_results) else f"Tool {tool_call.function.name} result: None"
-                    })
-            else:
-                return message.content or "No response generated"
+
+        if forced:
+            self.partial = True
+            messages.append({"role": "system", "content": DEADLINE_SYNTHESIS_PROMPT})
+        with span("llm", "round", route="tools", round=i):
+            response = await self._make_ai_request(messages, timeout=deadline.remaining())
+        prompt_tokens += self._prompt_tokens(response)
+        self._record_routing("tools", rounds=i + 1, prompt_tokens=prompt_tokens)
+        return response.choices[0].message.content or NO_RESPONSE_MESSAGE
+
+    @staticmethod
+    def _needs_tools(user_message: str, prompt_index: int | None, chat_history: list[dict[str, str]]) -> bool:
+        if prompt_index is not None:
+            return True
+        if _TOOL_ENTITY_PATTERN.search(user_message):
+            return True
+        words = _WORD_PATTERN.findall(user_message.lower())
+        if any(word in TOOL_ROUTING_KEYWORDS for word in words):
+            return True
+        # short follow-ups ("yes", "go deeper") continue whatever the previous turn was doing
+        return bool(chat_history) and len(words) <= TOOL_ROUTING_FOLLOW_UP_WORDS
+
+    def _record_tool_schema_savings(self, sent_tokens: int) -> None:
+        self._add_stats("tool_schemas", {
+            "rounds": 1,
+            "raw_tokens": self.mcp_client.raw_tool_tokens,
+            "minified_tokens": self.mcp_client.minified_tool_tokens,
+            "sent_tokens": sent_tokens
+        })
+
+    def _record_tool_result_compaction(self, calls: int, raw_tokens: int, compacted_tokens: int) -> None:
+        self._add_stats("tool_results", {
+            "calls": calls,
+            "raw_tokens": raw_tokens,
+            "compacted_tokens": compacted_tokens
+        })
+
+    @staticmethod
+    def _prompt_tokens(response: ChatCompletion) -> int:
+        return response.usage.prompt_tokens if response.usage else 0
+
+    def _record_routing(self, route: str, rounds: int, prompt_tokens: int) -> None:
+        self.route = route
+        self._add_stats("llm_routing", {
+            f"{route}_turns": 1,
+            f"{route}_rounds": rounds,
+            f"{route}_prompt_tokens": prompt_tokens
+        })
+
+    def _add_stats(self, name: str, values: dict[str, float]) -> None:
+        stats = self._stats.setdefault(name, {})
+        for field, amount in values.items():
+            stats[field] = stats.get(field, 0) + amount
+
+    async def _flush_stats(self) -> None:
+        if not self._stats:
+            return
+        stats, self._stats = self._stats, {}
+        try:
+            await self.redis_client.increment_stats_batch(stats)
+        except Exception as e:
+            logger.warning("Failed to record LLM stats: %s", e)
     
     async def _get_chat_history(self) -> list[dict[str, str]]:
         try:
@@ -95,10 +233,19 @@ class LLMClient:
             
             return chat_history
         except Exception as e:
-            print(f"❌ Error getting chat history from Redis: {e}")
+            logger.error("Error getting chat history from Redis: %s", e)
             return []
 
-    async def _make_ai_request(self, messages: list[dict], tools: list[dict] = None) -> ChatCompletion:
+    async def _get_known_facts(self) -> str | None:
+        if self.mcp_client.memory is None:
+            return None
+        return await self.mcp_client.memory.known_facts()
+
+    async def _make_ai_request(self,
+                               messages: list[dict],
+                               tools: list[dict] = None,
+                               purpose: str = "answer",
+                               timeout: float | None = None) -> ChatCompletion:
         request_params = {
             "model": MODEL,
             "messages": messages,
@@ -108,9 +255,20 @@ class LLMClient:
             request_params["tools"] = tools
             request_params["tool_choice"] = "auto"
         try:
-            return await self.openai_client.chat.completions.create(**request_params)
+            response = await asyncio.wait_for(self._create_completion(request_params, purpose), timeout)
+        except (asyncio.TimeoutError, UpstreamRateLimitError):
+            raise
         except Exception as e:
             raise LLMClientError(f"Failed to make AI request: {str(e)}") from e
+        if response.usage:
+            observe_llm_usage(purpose, response.usage.prompt_tokens, response.usage.completion_tokens)
+        return response
+
+    async def _create_completion(self, request_params: dict, purpose: str) -> ChatCompletion:
+        # limiter and queue waits count against the caller's timeout too
+        if self.limiter is not None:
+            await self.limiter.acquire("openai")
+        return await self.openai.create_chat_completion(request_params, OPENAI_PRIORITIES.get(purpose, 0))
 
     async def generate_chat_title(self, message: str) -> str:
         messages = list()
@@ -122,5 +280,5 @@ class LLMClient:
             "role": "user",
             "content": message
         })
-        response = await self._make_ai_request(messages)
+        response = await self._make_ai_request(messages, purpose="title")
         return response.choices[0].message.content
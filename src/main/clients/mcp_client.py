@@ -1,48 +1,321 @@
+import asyncio
+import json
+import logging
+import re
+import time
 from typing import Any
 
+from .circuit_breaker import CircuitBreaker
 from .mcp_providers import MCPProvider, OpenSeaMCPProvider, TweetScoutMCPProvider
+from .tool_memory import ToolMemory
+from .upstream_limiter import UpstreamLimiter
+from constants import (
+    TOOL_SCHEMA_CACHE_TTL_SECONDS, TASK_TOOL_PREFIXES, TOOL_RESULT_TOKEN_BUDGET, TOOL_RESULT_MAX_LIST_ITEMS,
+    TOOL_RESULT_MAX_STRING_LENGTH, TOOL_RESULT_DROP_KEYS, TOOL_RESULT_FIELDS, PREFETCH_RULES, PREFETCH_MAX_CALLS
+)
+from exceptions import UpstreamRateLimitError, UpstreamUnavailableError
+from utils.metrics import span, observe_tool_call, observe_tool_prefetch
+
+logger = logging.getLogger(__name__)
+
+_IMAGE_URL_PATTERN = re.compile(r"^https?://\S+\.(?:png|jpe?g|gif|webp|svg|avif)(?:\?\S*)?$", re.IGNORECASE)
+_PREFETCH_RULES = tuple((re.compile(pattern), tool_name, arg_name) for pattern, tool_name, arg_name in PREFETCH_RULES)
+
+
+def estimate_tokens(tools: list[dict]) -> int:
+    return len(json.dumps(tools, separators=(",", ":"))) // 4
+
+
+def minify_tool_schema(schema: Any) -> Any:
+    if isinstance(schema, dict):
+        return {
+            key: " ".join(value.split()) if key == "description" and isinstance(value, str)
+            else minify_tool_schema(value)
+            for key, value in schema.items()
+            if key != "$schema" and not (key == "title" and isinstance(value, str))
+        }
+    if isinstance(schema, list):
+        return [minify_tool_schema(item) for item in schema]
+    return schema
+
+
+def extract_prefetch_calls(message: str, tools: list[dict]) -> list[tuple[str, dict]]:
+    # only tools the model is offered, and only when their schema takes the extracted argument
+    tool_params = {
+        tool["function"]["name"]: tool["function"].get("parameters", {}).get("properties", {}) for tool in tools
+    }
+    calls, seen = [], set()
+    for pattern, tool_name, arg_name in _PREFETCH_RULES:
+        if arg_name not in tool_params.get(tool_name, {}):
+            continue
+        for value in pattern.findall(message):
+            key = _prefetch_key(tool_name, {arg_name: value})
+            if key not in seen:
+                seen.add(key)
+                calls.append((tool_name, {arg_name: value}))
+    return calls[:PREFETCH_MAX_CALLS]
+
+
+def _prefetch_key(tool_name: str, tool_args: dict) -> str:
+    # handles and addresses are case-insensitive, and the model may keep the @
+    normalized = {
+        name: value.lstrip("@").lower() if isinstance(value, str) else value for name, value in tool_args.items()
+    }
+    return f"{tool_name}:{json.dumps(normalized, sort_keys=True, separators=(',', ':'))}"
+
+
+def compact_tool_result(tool_name: str, result: Any, token_budget: int = TOOL_RESULT_TOKEN_BUDGET) -> str:
+    data = _unwrap_tool_result(result)
+    if isinstance(data, str):
+        text = data
+    else:
+        # errors keep their status/message fields whatever the tool projection is
+        fields = None if isinstance(data, dict) and data.get("status") == "error" else TOOL_RESULT_FIELDS.get(tool_name)
+        compacted = _compact_value(data, fields)
+        text = json.dumps(compacted, separators=(",", ":"), ensure_ascii=False, default=str)
+    max_chars = token_budget * 4
+    if len(text) > max_chars:
+        text = text[:max_chars] + "…[truncated]"
+    return text
+
+
+def _unwrap_tool_result(result: Any) -> Any:
+    # MCP servers return a list of content objects; only text parts carry data, usually JSON-encoded
+    if isinstance(result, list) and result and all(hasattr(item, "type") for item in result):
+        parts = [_unwrap_tool_result(item.text) for item in result if getattr(item, "type", None) == "text"]
+        return parts[0] if len(parts) == 1 else parts
+    if isinstance(result, str):
+        try:
+            return json.loads(result)
+        except ValueError:
+            return result.strip()
+    if isinstance(result, dict) and result.get("status") == "ok" and "data" in result:
+        return result["data"]
+    return result
+
+
+def _compact_value(value: Any, fields: tuple[str, ...] | None) -> Any:
+    if isinstance(value, dict):
+        compacted = {}
+        for key, item in value.items():
+            if key in TOOL_RESULT_DROP_KEYS:
+                continue
+            if not fields or key in fields or isinstance(item, (dict, list)):
+                item = _compact_value(item, fields)
+                if item not in (None, "", [], {}):
+                    compacted[key] = item
+        return compacted
+    if isinstance(value, list):
+        items = [_compact_value(item, fields) for item in value[:TOOL_RESULT_MAX_LIST_ITEMS]]
+        if len(value) > TOOL_RESULT_MAX_LIST_ITEMS:
+            items.append(f"…{len(value) - TOOL_RESULT_MAX_LIST_ITEMS} more")
+        return items
+    if isinstance(value, str):
+        if _IMAGE_URL_PATTERN.match(value):
+            return None
+        if len(value) > TOOL_RESULT_MAX_STRING_LENGTH:
+            return value[:TOOL_RESULT_MAX_STRING_LENGTH] + "…"
+    return value
 
 
 class MCPClient:
-    def __init__(self):
+    # provider name -> (expires_at, raw token estimate, minified tools), shared by every client in the process
+    _tool_cache: dict[str, tuple[float, int, list[dict]]] = {}
+    _task_tool_cache: dict[tuple[str, tuple[str, ...]], list[dict]] = {}
+
+    def __init__(self,
+                 cost_limit: float | None = None,
+                 limiter: UpstreamLimiter | None = None,
+                 memory: ToolMemory | None = None):
         self.providers: list[MCPProvider] = []
         self.all_tools = []
+        self.raw_tool_tokens = 0
+        self.minified_tool_tokens = 0
         self.total_cost_usd = 0.0
+        self.cost_limit = cost_limit
+        self.limiter = limiter
+        self.memory = memory
+        # set when a tool call fell back to a placeholder instead of data; such answers are not cached
+        self.degraded = False
+        self._prefetches: dict[str, asyncio.Task] = {}
     
     async def initialize_all_providers(self) -> None:
         self.all_tools = []
+        self.raw_tool_tokens = 0
         
         for provider in self.providers:
+            provider_name = provider.get_provider_name()
+            cached = self._tool_cache.get(provider_name)
+            if cached and cached[0] > time.monotonic():
+                self.raw_tool_tokens += cached[1]
+                self.all_tools.extend(cached[2])
+                continue
+            breaker = CircuitBreaker.for_provider(provider_name)
+            if not breaker.is_available():
+                continue
             try:
-                tools = await provider.get_tools()
-                self.all_tools.extend(tools)
-                print(f"✅ {provider.get_provider_name()} provider initialized with {len(tools)} tools")
+                async with breaker.call():
+                    tools = await provider.get_tools()
+                minified_tools = minify_tool_schema(tools)
+                if minified_tools:
+                    self._tool_cache[provider_name] = (
+                        time.monotonic() + TOOL_SCHEMA_CACHE_TTL_SECONDS, estimate_tokens(tools), minified_tools
+                    )
+                self.raw_tool_tokens += estimate_tokens(tools)
+                self.all_tools.extend(minified_tools)
+                logger.info("%s provider initialized with %s tools", provider_name, len(tools))
             except Exception as e:
-                print(f"❌ Failed to initialize {provider.get_provider_name()}: {e}")
+                logger.error("Failed to initialize %s: %s", provider_name, e)
+        self.minified_tool_tokens = estimate_tokens(self.all_tools)
     
-    async def execute_tool(self, tool_name: str, tool_args: dict) -> Any:
-        for provider in self.providers:
-            provider_name = provider.get_provider_name()
-            if tool_name.startswith(f"{provider_name}_"):
-                try:
-                    tool_cost = provider.get_tool_cost(tool_name)
-                    result = await provider.execute_tool(tool_name, tool_args)
-                    self.total_cost_usd += tool_cost
-                    print(f"💰 Tool {tool_name} cost: ${tool_cost:.4f} (Total: ${self.total_cost_usd:.4f})")
-                    
+    async def execute_tool(self, tool_name: str, tool_args: dict, timeout: float | None = None) -> Any:
+        provider = self._get_provider(tool_name)
+        if provider is None:
+            return self._fallback(f"No provider found for tool: {tool_name}")
+        provider_name = provider.get_provider_name()
+        # an identical call earlier in this chat is answered from memory, free of charge
+        if self.memory is not None:
+            remembered = await self.memory.recall(tool_name, tool_args)
+            if remembered is not None:
+                return remembered
+        tool_cost = provider.get_tool_cost(tool_name)
+        if self.cost_limit is not None and self.total_cost_usd + tool_cost > self.cost_limit + 1e-9:
+            return self._fallback(f"Not enough credits to execute {tool_name}, answer with the data already available")
+        prefetch = self._prefetches.pop(_prefetch_key(tool_name, tool_args), None)
+        if prefetch is not None:
+            start = time.perf_counter()
+            try:
+                with span("mcp", "tool_call", tool=tool_name, prefetched=True):
+                    result = await asyncio.wait_for(prefetch, timeout)
+            except asyncio.TimeoutError:
+                observe_tool_prefetch(tool_name, "failed")
+                observe_tool_call(tool_name, time.perf_counter() - start, 0.0, failed=True)
+                return self._fallback(f"{tool_name} timed out, answer with the data already available")
+            except Exception as e:
+                # a failed prefetch falls back to a regular call
+                logger.debug("Prefetched %s failed: %s", tool_name, e)
+                observe_tool_prefetch(tool_name, "failed")
+            else:
+                if result is not None:
+                    observe_tool_prefetch(tool_name, "used")
+                    await self._record_tool_result(tool_name, tool_args, tool_cost, result, start)
                     return result
-                except Exception as e:
-                    return f"Error executing {tool_name}: {e}"
-        
-        return f"No provider found for tool: {tool_name}"
+        breaker = CircuitBreaker.for_provider(provider_name)
+        if not breaker.is_available():
+            return self._fallback(f"{provider_name} is unavailable right now, answer with the data already available")
+        if self.limiter is not None:
+            try:
+                await self.limiter.acquire(provider_name)
+            except UpstreamRateLimitError:
+                return self._fallback(f"{provider_name} is rate limited right now, answer with the data already available")
+        start = time.perf_counter()
+        try:
+            with span("mcp", "tool_call", tool=tool_name):
+                result = await asyncio.wait_for(self._call_tool(breaker, provider, tool_name, tool_args), timeout)
+            await self._record_tool_result(tool_name, tool_args, tool_cost, result, start)
+            
+            return result
+        except asyncio.TimeoutError:
+            observe_tool_call(tool_name, time.perf_counter() - start, 0.0, failed=True)
+            return self._fallback(f"{tool_name} timed out, answer with the data already available")
+        except UpstreamUnavailableError:
+            return self._fallback(f"{provider_name} is unavailable right now, answer with the data already available")
+        except Exception as e:
+            observe_tool_call(tool_name, time.perf_counter() - start, 0.0, failed=True)
+            return self._fallback(f"Error executing {tool_name}: {e}")
+
+    def _fallback(self, message: str) -> str:
+        self.degraded = True
+        return message
+
+    async def _record_tool_result(self, tool_name: str, tool_args: dict, tool_cost: float, result: Any, start: float) -> None:
+        self.total_cost_usd += tool_cost
+        observe_tool_call(tool_name, time.perf_counter() - start, tool_cost, failed=False)
+        logger.debug("Tool %s cost: $%.4f (total: $%.4f)", tool_name, tool_cost, self.total_cost_usd)
+        # errors are answers for this turn only; a later turn should try the call again
+        if self.memory is not None and not (isinstance(result, dict) and result.get("status") == "error"):
+            await self.memory.remember(tool_name, tool_args, compact_tool_result(tool_name, result))
+
+    def start_prefetch(self, tool_calls: list[tuple[str, dict]], timeout: float | None = None) -> None:
+        # runs likely calls while the model plans; they are charged only when execute_tool consumes them,
+        # so only calls the held credits could pay for are started
+        prefetch_cost = 0.0
+        for tool_name, tool_args in tool_calls:
+            key = _prefetch_key(tool_name, tool_args)
+            provider = self._get_provider(tool_name)
+            if provider is None or key in self._prefetches:
+                continue
+            tool_cost = provider.get_tool_cost(tool_name)
+            if self.cost_limit is not None and self.total_cost_usd + prefetch_cost + tool_cost > self.cost_limit + 1e-9:
+                continue
+            prefetch_cost += tool_cost
+            self._prefetches[key] = asyncio.create_task(self._prefetch(provider, tool_name, tool_args, timeout))
+
+    def cancel_prefetches(self) -> None:
+        for key, task in self._prefetches.items():
+            observe_tool_prefetch(key.split(":", 1)[0], "unused")
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()
+        self._prefetches.clear()
+
+    async def _prefetch(self, provider: MCPProvider, tool_name: str, tool_args: dict, timeout: float | None) -> Any:
+        provider_name = provider.get_provider_name()
+        breaker = CircuitBreaker.for_provider(provider_name)
+        if not breaker.is_available():
+            return None
+        if self.memory is not None and await self.memory.lookup(tool_name, tool_args) is not None:
+            return None
+        if self.limiter is not None:
+            await self.limiter.acquire(provider_name)
+        return await asyncio.wait_for(self._call_tool(breaker, provider, tool_name, tool_args), timeout)
+
+    @staticmethod
+    async def _call_tool(breaker: CircuitBreaker, provider: MCPProvider, tool_name: str, tool_args: dict) -> Any:
+        # the request deadline is applied outside the breaker: running out of budget cancels the call,
+        # which the breaker does not count against the provider
+        async with breaker.call():
+            return await provider.execute_tool(tool_name, tool_args)
+
+    def _get_provider(self, tool_name: str) -> MCPProvider | None:
+        for provider in self.providers:
+            if tool_name.startswith(f"{provider.get_provider_name()}_"):
+                return provider
+        return None
     
     def get_all_tools(self) -> list[dict]:
-        return self.all_tools.copy()
+        return self._available_tools(self.all_tools)
+
+    def get_tools_for_task(self, task_name: str | None) -> list[dict]:
+        prefixes = TASK_TOOL_PREFIXES.get(task_name)
+        if not prefixes:
+            return self.get_all_tools()
+        tool_names = tuple(tool["function"]["name"] for tool in self.all_tools)
+        cache_key = (task_name, tool_names)
+        if cache_key not in self._task_tool_cache:
+            if len(self._task_tool_cache) >= 32:
+                self._task_tool_cache.clear()
+            selected = [tool for tool in self.all_tools if tool["function"]["name"].startswith(prefixes)]
+            self._task_tool_cache[cache_key] = selected or self.all_tools
+        return self._available_tools(self._task_tool_cache[cache_key])
+
+    def _available_tools(self, tools: list[dict]) -> list[dict]:
+        # tools of providers behind an open circuit are hidden until the circuit lets a probe through
+        unavailable = tuple(
+            f"{provider.get_provider_name()}_" for provider in self.providers
+            if not CircuitBreaker.for_provider(provider.get_provider_name()).is_available()
+        )
+        if not unavailable:
+            return tools.copy()
+        return [tool for tool in tools if not tool["function"]["name"].startswith(unavailable)]
     
     def get_total_cost(self) -> float:
         return self.total_cost_usd
     
     async def setup_default_providers(self):
+        if self.providers:
+            return
         self.providers.append(OpenSeaMCPProvider())
         self.providers.append(TweetScoutMCPProvider())
         await self.initialize_all_providers()
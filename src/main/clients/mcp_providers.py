@@ -1,3 +1,4 @@
+import logging
 import os
 import aiohttp
 from typing import Any
@@ -6,6 +7,10 @@ from abc import ABC, abstractmethod
 from mcp import ClientSession
 from mcp.client.sse import sse_client
 
+from exceptions import MCPProviderError
+
+logger = logging.getLogger(__name__)
+
 
 class MCPProvider(ABC):
 
@@ -40,45 +45,43 @@ class OpenSeaMCPProvider(MCPProvider):
         }
     
     async def get_tools(self) -> list[dict]:
-        try:
-            print(f"🔧 Getting tools from OpenSea MCP...")
-            async with sse_client(
-                url=self.server_url, 
-                headers={'Authorization': f'Bearer {self.bearer_token}'}
-            ) as (in_s, out_s):
-                async with ClientSession(in_s, out_s) as sess:
-                    info = await sess.initialize()
-                    print("OpenSea MCP info:", info)
-                    mcp_tools = await sess.list_tools()
-                    tools_list = mcp_tools.tools if hasattr(mcp_tools, 'tools') else mcp_tools
-                    
-                    self.tools = [{
-                        "type": "function",
-                        "function": {
-                            "name": f"opensea_{tool.name}",
-                            "description": tool.description,
-                            "parameters": tool.inputSchema
-                        }
-                    } for tool in tools_list]
-                    print(f"✅ Retrieved {len(self.tools)} tools from OpenSea MCP")
-                    return self.tools
-        except Exception as e:
-            print(f"❌ Error getting OpenSea tools: {e}")
-            return []
+        # failures propagate so the circuit breaker sees them
+        logger.debug("Getting tools from OpenSea MCP")
+        async with sse_client(
+            url=self.server_url, 
+            headers={'Authorization': f'Bearer {self.bearer_token}'}
+        ) as (in_s, out_s):
+            async with ClientSession(in_s, out_s) as sess:
+                info = await sess.initialize()
+                logger.debug("OpenSea MCP info: %s", info)
+                mcp_tools = await sess.list_tools()
+                tools_list = mcp_tools.tools if hasattr(mcp_tools, 'tools') else mcp_tools
+                
+                self.tools = [{
+                    "type": "function",
+                    "function": {
+                        "name": f"opensea_{tool.name}",
+                        "description": tool.description,
+                        "parameters": tool.inputSchema
+                    }
+                } for tool in tools_list]
+                logger.info("Retrieved %s tools from OpenSea MCP", len(self.tools))
+                return self.tools
     
     async def execute_tool(self, tool_name: str, tool_args: dict) -> Any:
         actual_tool_name = tool_name.replace("opensea_", "")
-        try:
-            async with sse_client(
-                url=self.server_url, 
-                headers={'Authorization': f'Bearer {self.bearer_token}'}
-            ) as (in_s, out_s):
-                async with ClientSession(in_s, out_s) as sess:
-                    await sess.initialize()
-                    result = await sess.call_tool(actual_tool_name, tool_args)
-                    return result.content
-        except Exception as e:
-            return f"❌ OpenSea Error: {e}"
+        async with sse_client(
+            url=self.server_url, 
+            headers={'Authorization': f'Bearer {self.bearer_token}'}
+        ) as (in_s, out_s):
+            async with ClientSession(in_s, out_s) as sess:
+                await sess.initialize()
+                result = await sess.call_tool(actual_tool_name, tool_args)
+                # tool-level errors take the same shape as TweetScout's so callers can tell them from data
+                if result.isError:
+                    message = " ".join(item.text for item in result.content if getattr(item, "type", None) == "text")
+                    return {"status": "error", "message": message}
+                return result.content
     
     def get_provider_name(self) -> str:
         return "opensea"
@@ -90,7 +93,7 @@ class OpenSeaMCPProvider(MCPProvider):
 class TweetScoutMCPProvider(MCPProvider):
     def __init__(self):
         self.api_key = os.getenv("TWEETSCOUT_API_KEY")
-        self.base_url = "https://api.tweetscout.io/v2"
+        self.base_url = os.getenv("TWEETSCOUT_BASE_URL", "https://api.tweetscout.io/v2")
         self.tools = []
         self.tool_costs = {
             "tweetscout_get_score": 0.1,
@@ -209,7 +212,7 @@ class TweetScoutMCPProvider(MCPProvider):
                 }
             }
         ]
-        print(f"✅ Retrieved {len(self.tools)} TweetScout tools")
+        logger.debug("Retrieved %s TweetScout tools", len(self.tools))
         return self.tools
     
     async def execute_tool(self, tool_name: str, tool_args: dict) -> Any:
@@ -224,50 +227,12 @@ class TweetScoutMCPProvider(MCPProvider):
         return f"❌ Unknown TweetScout tool: {tool_name}"
     
     async def _get_tweetscout_score(self, inputs: dict) -> Any:
-        user_handle = inputs["user_handle"]
-        url = f"{self.base_url}/score/{user_handle}"
-        
-        headers = {
-            "ApiKey": self.api_key, 
-            'Accept': 'application/json'
-        }
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {"status": "ok", "data": data}
-                    else:
-                        error = await response.text()
-                        return {"status": "error", "code": response.status, "message": error}
-        except Exception as e:
-            return {"status": "error", "message": str(e)}
+        return await self._get(f"/score/{inputs['user_handle']}")
     
     async def _get_tweetscout_info(self, inputs: dict) -> Any:
-        user_handle = inputs["user_handle"]
-        url = f"{self.base_url}/info/{user_handle}"
-        
-        headers = {
-            "ApiKey": self.api_key,
-            'Accept': 'application/json'
-        }
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {"status": "ok", "data": data}
-                    else:
-                        error = await response.text()
-                        return {"status": "error", "code": response.status, "message": error}
-        except Exception as e:
-            return {"status": "error", "message": str(e)}
+        return await self._get(f"/info/{inputs['user_handle']}")
     
     async def _get_tweetscout_followers_stats(self, inputs: dict) -> Any:
-        url = f"{self.base_url}/followers-stats"
-        
         params = {}
         if "user_handle" in inputs:
             params["user_handle"] = inputs["user_handle"]
@@ -277,47 +242,31 @@ class TweetScoutMCPProvider(MCPProvider):
         if not params:
             return {"status": "error", "message": "Either user_handle or user_id is required"}
         
-        headers = {
-            "ApiKey": self.api_key,
-            'Accept': 'application/json'
-        }
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {"status": "ok", "data": data}
-                    else:
-                        error = await response.text()
-                        return {"status": "error", "code": response.status, "message": error}
-        except Exception as e:
-            return {"status": "error", "message": str(e)}
+        return await self._get("/followers-stats", params)
     
     async def _get_tweetscout_top_followers(self, inputs: dict) -> Any:
-        user_handle = inputs["user_handle"]
-        url = f"{self.base_url}/top-followers/{user_handle}"
-        
         params = {}
         if "from" in inputs:
             params["from"] = inputs["from"]
         
+        return await self._get(f"/top-followers/{inputs['user_handle']}", params)
+    
+    async def _get(self, path: str, params: dict | None = None) -> dict:
         headers = {
             "ApiKey": self.api_key,
             'Accept': 'application/json'
         }
         
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {"status": "ok", "data": data}
-                    else:
-                        error = await response.text()
-                        return {"status": "error", "code": response.status, "message": error}
-        except Exception as e:
-            return {"status": "error", "message": str(e)}
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{self.base_url}{path}", headers=headers, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return {"status": "ok", "data": data}
+                error = await response.text()
+                # throttling and server errors mean TweetScout is unhealthy; anything else is an answer for the model
+                if response.status == 429 or response.status >= 500:
+                    raise MCPProviderError(f"TweetScout returned {response.status}: {error}")
+                return {"status": "error", "code": response.status, "message": error}
     
     def get_provider_name(self) -> str:
         return "tweetscout"
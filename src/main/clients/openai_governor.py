@@ -0,0 +1,194 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import random
+import re
+import time
+
+import openai
+from openai.types.chat import ChatCompletion
+
+from constants import (
+    OPENAI_INITIAL_CONCURRENCY, OPENAI_MIN_CONCURRENCY, OPENAI_MAX_CONCURRENCY, OPENAI_MAX_ATTEMPTS,
+    OPENAI_BACKOFF_BASE_SECONDS, OPENAI_BACKOFF_MAX_SECONDS, OPENAI_RATE_LIMIT_HEADROOM
+)
+from exceptions import UpstreamRateLimitError
+from utils.metrics import observe_upstream_retry, set_upstream_concurrency
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PART_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_reset_duration(value: str | None) -> float | None:
+    # OpenAI reports resets as "20ms", "1.5s" or "6m0s"
+    if not value:
+        return None
+    parts = _DURATION_PART_PATTERN.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class OpenAIGovernor:
+    _instance = None
+
+    def __init__(self):
+        self.client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+        self.min_limit = OPENAI_MIN_CONCURRENCY
+        self.max_limit = int(os.getenv("OPENAI_MAX_CONCURRENCY", OPENAI_MAX_CONCURRENCY))
+        self.limit = float(min(self.max_limit, int(os.getenv("OPENAI_INITIAL_CONCURRENCY", OPENAI_INITIAL_CONCURRENCY))))
+        self.in_flight = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+
+    @classmethod
+    def initialize(cls):
+        if cls._instance:
+            raise RuntimeError("OpenAIGovernor is already initialized. Use get_instance() to access it.")
+        cls._instance = cls()
+
+    @classmethod
+    def get_instance(cls) -> 'OpenAIGovernor':
+        if cls._instance is None:
+            raise RuntimeError("OpenAIGovernor not initialized. Call initialize() first.")
+        return cls._instance
+
+    @classmethod
+    async def close(cls) -> None:
+        if cls._instance is not None:
+            await cls._instance.client.close()
+            cls._instance = None
+
+    async def create_chat_completion(self, request_params: dict, priority: int = 0) -> ChatCompletion:
+        for attempt in range(OPENAI_MAX_ATTEMPTS):
+            await self._acquire(priority)
+            try:
+                raw_response = await self.client.chat.completions.with_raw_response.create(**request_params)
+                self._on_success(raw_response.headers)
+                return raw_response.parse()
+            except openai.RateLimitError as e:
+                if attempt == OPENAI_MAX_ATTEMPTS - 1:
+                    # still throttled after every retry: a busy upstream, not a failed request
+                    raise UpstreamRateLimitError("OpenAI is rate limited right now, please retry shortly") from e
+                observe_upstream_retry("openai", "rate_limited")
+                self._on_throttled(e.response.headers, attempt)
+                delay = 0.0
+            except (openai.InternalServerError, openai.APIConnectionError) as e:
+                if attempt == OPENAI_MAX_ATTEMPTS - 1:
+                    raise
+                observe_upstream_retry("openai", "unavailable")
+                logger.warning("OpenAI request failed (attempt %s), retrying: %s", attempt + 1, e)
+                delay = self._backoff(attempt)
+            finally:
+                self._release()
+            # a throttled retry waits in the queue for the pause to end; other failures back off on their own
+            await asyncio.sleep(delay)
+
+    async def _acquire(self, priority: int) -> None:
+        if not self._waiters and self.in_flight < int(self.limit) and time.monotonic() >= self._paused_until:
+            self.in_flight += 1
+            set_upstream_concurrency("openai", self.limit, self.in_flight)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # the slot may have been handed over just before the cancellation landed
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        if time.monotonic() < self._paused_until:
+            return
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+        set_upstream_concurrency("openai", self.limit, self.in_flight)
+
+    def _on_success(self, headers) -> None:
+        limit_requests = self._header_number(headers, "x-ratelimit-limit-requests")
+        remaining_requests = self._header_number(headers, "x-ratelimit-remaining-requests")
+        limit_tokens = self._header_number(headers, "x-ratelimit-limit-tokens")
+        remaining_tokens = self._header_number(headers, "x-ratelimit-remaining-tokens")
+        near_request_limit = (
+            limit_requests and remaining_requests is not None
+            and remaining_requests <= limit_requests * OPENAI_RATE_LIMIT_HEADROOM
+        )
+        near_token_limit = (
+            limit_tokens and remaining_tokens is not None
+            and remaining_tokens <= limit_tokens * OPENAI_RATE_LIMIT_HEADROOM
+        )
+        if near_request_limit or near_token_limit:
+            # hold at the current level instead of probing further; pause outright once a budget is spent
+            self.limit = max(self.min_limit, min(self.limit, self.in_flight))
+            if remaining_requests == 0 or remaining_tokens == 0:
+                reset = max(
+                    parse_reset_duration(headers.get("x-ratelimit-reset-requests")) or 0.0,
+                    parse_reset_duration(headers.get("x-ratelimit-reset-tokens")) or 0.0
+                )
+                self._pause(reset)
+            return
+        # additive increase: roughly one extra slot per `limit` successful requests
+        self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def _on_throttled(self, headers, attempt: int) -> None:
+        now = time.monotonic()
+        # one multiplicative decrease per burst of 429s, not one per failed request
+        if now - self._last_decrease > 1.0:
+            self.limit = max(self.min_limit, self.limit / 2)
+            self._last_decrease = now
+            logger.warning("OpenAI rate limited, concurrency limit lowered to %s", int(self.limit))
+        retry_after = self._retry_after(headers)
+        delay = max(retry_after or 0.0, self._backoff(attempt))
+        self._pause(delay)
+
+    def _pause(self, delay: float) -> None:
+        if delay <= 0:
+            return
+        paused_until = time.monotonic() + delay
+        if paused_until > self._paused_until:
+            self._paused_until = paused_until
+            asyncio.get_running_loop().call_later(delay, self._wake)
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        # full jitter so retries from concurrent requests spread out
+        return random.uniform(0, min(OPENAI_BACKOFF_MAX_SECONDS, OPENAI_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(headers) -> float | None:
+        if headers is None:
+            return None
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms:
+            try:
+                return float(retry_after_ms) / 1000
+            except ValueError:
+                pass
+        return parse_reset_duration(headers.get("retry-after"))
+
+    @staticmethod
+    def _header_number(headers, name: str) -> float | None:
+        value = headers.get(name)
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
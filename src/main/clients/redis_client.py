@@ -1,12 +1,233 @@
 import json
+import logging
 import os
+import time
+import uuid
 from typing import Any
 import redis.asyncio as redis
 from exceptions import RedisConnectionError, RedisOperationError
 from dto import MessageEntity
 from enums import MessageRole
 from datetime import datetime
-from dto import DepositEvent, SpendEvent
+
+logger = logging.getLogger(__name__)
+
+# subscriber reads poll below the 5s socket timeout instead of blocking on it
+PUBSUB_POLL_SECONDS = 1.0
+
+ACQUIRE_LEASE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return false
+end
+local token = redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+redis.call('SET', KEYS[1], token, 'PX', ARGV[1])
+return token
+"""
+
+RENEW_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+ENQUEUE_CHAT_JOB_SCRIPT = """
+if redis.call('EXISTS', KEYS[5]) == 1 then
+    return -3
+end
+local latest = redis.call('GET', KEYS[4])
+if latest then
+    local status = redis.call('HGET', 'chat_job:' .. latest, 'status')
+    if status and status ~= 'completed' and status ~= 'failed' then
+        return -3
+    end
+end
+if redis.call('XLEN', KEYS[1]) >= tonumber(ARGV[1]) then
+    return -1
+end
+if tonumber(redis.call('GET', KEYS[2]) or '0') >= tonumber(ARGV[2]) then
+    return -2
+end
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+redis.call('HSET', KEYS[3], 'job_id', ARGV[3], 'status', 'queued', 'payload', ARGV[4])
+redis.call('EXPIRE', KEYS[3], ARGV[5])
+redis.call('XADD', KEYS[1], '*', 'job_id', ARGV[3], 'payload', ARGV[4])
+redis.call('SET', KEYS[4], ARGV[3], 'EX', ARGV[5])
+return 1
+"""
+
+FINISH_CHAT_JOB_SCRIPT = """
+redis.call('XACK', KEYS[1], ARGV[1], ARGV[2])
+redis.call('XDEL', KEYS[1], ARGV[2])
+if tonumber(redis.call('GET', KEYS[2]) or '0') > 0 then
+    redis.call('DECR', KEYS[2])
+end
+return 1
+"""
+
+RESERVE_CREDITS_SCRIPT = """
+local now = tonumber(ARGV[5])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+local held = 0
+for _, member in ipairs(redis.call('ZRANGE', KEYS[1], 0, -1)) do
+    held = held + tonumber(string.match(member, ':([^:]+)$'))
+end
+local granted = math.min(tonumber(ARGV[2]), tonumber(ARGV[4]) - held)
+if granted < tonumber(ARGV[3]) then
+    return false
+end
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[6]), ARGV[1] .. ':' .. tostring(granted))
+redis.call('EXPIRE', KEYS[1], ARGV[6])
+return tostring(granted)
+"""
+
+RELEASE_CREDITS_SCRIPT = """
+for _, member in ipairs(redis.call('ZRANGE', KEYS[1], 0, -1)) do
+    if string.sub(member, 1, string.len(ARGV[1]) + 1) == ARGV[1] .. ':' then
+        return redis.call('ZREM', KEYS[1], member)
+    end
+end
+return 0
+"""
+
+DRAIN_USER_EVENTS_SCRIPT = """
+local events = redis.call('ZRANGEBYSCORE', KEYS[1], ARGV[1], '+inf', 'LIMIT', 0, ARGV[2])
+if #events > 0 then
+    redis.call('ZREM', KEYS[1], unpack(events))
+end
+return events
+"""
+
+SET_CACHED_ENTITY_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[2] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+return 1
+"""
+
+# returns the existing record, or an empty list when the key was free and is now claimed by ARGV[2]
+CLAIM_IDEMPOTENCY_KEY_SCRIPT = """
+local record = redis.call('HGETALL', KEYS[1])
+if #record > 0 then
+    return record
+end
+redis.call('HSET', KEYS[1], 'status', 'in_flight', 'fingerprint', ARGV[1], 'owner', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return {}
+"""
+
+COMPLETE_IDEMPOTENCY_KEY_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'owner') ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'status', 'completed', 'response', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('PUBLISH', KEYS[2], 'completed')
+return 1
+"""
+
+RELEASE_IDEMPOTENCY_KEY_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'owner') ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('PUBLISH', KEYS[2], 'released')
+return 1
+"""
+
+TOKEN_BUCKET_FUNCTIONS = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+
+local function refill(key, capacity, rate)
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or capacity
+    local elapsed = math.max(0, now - (tonumber(bucket[2]) or now))
+    return math.min(capacity, tokens + elapsed * rate)
+end
+
+local function store(key, tokens, capacity, rate)
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate))
+end
+"""
+
+# ARGV: cost, then capacity and refill rate (tokens per ms) for every key; all buckets are charged or none is
+CONSUME_RATE_LIMIT_SCRIPT = TOKEN_BUCKET_FUNCTIONS + """
+local cost = tonumber(ARGV[1])
+local tokens = {}
+local allowed = 1
+local retry_ms = 0
+for i, key in ipairs(KEYS) do
+    local capacity, rate = tonumber(ARGV[i * 2]), tonumber(ARGV[i * 2 + 1])
+    tokens[i] = refill(key, capacity, rate)
+    if tokens[i] < cost then
+        allowed = 0
+        retry_ms = math.max(retry_ms, math.ceil((cost - tokens[i]) / rate))
+    end
+end
+local tightest, tightest_ratio, reset_ms = 1, nil, 0
+for i, key in ipairs(KEYS) do
+    local capacity, rate = tonumber(ARGV[i * 2]), tonumber(ARGV[i * 2 + 1])
+    if allowed == 1 then
+        tokens[i] = tokens[i] - cost
+        store(key, tokens[i], capacity, rate)
+    end
+    if tightest_ratio == nil or tokens[i] / capacity < tightest_ratio then
+        tightest, tightest_ratio = i, tokens[i] / capacity
+        reset_ms = math.ceil((capacity - tokens[i]) / rate)
+    end
+end
+return {allowed, tightest, math.max(0, math.floor(tokens[tightest])), reset_ms, retry_ms}
+"""
+
+# KEYS: shared bucket, member bucket, active members zset, member weights hash
+# ARGV: capacity, rate, cost, member, weight, active window ms, contention threshold
+# While the shared bucket is above the threshold anyone may draw from it; below it a member needs tokens
+# in its own bucket, sized by its weight among the members active in the window. Draws made while
+# uncontended still debit the member bucket, so heavy users queue behind light ones once contention starts.
+FAIR_ACQUIRE_SCRIPT = TOKEN_BUCKET_FUNCTIONS + """
+local capacity, rate, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local member, weight, window = ARGV[4], tonumber(ARGV[5]), tonumber(ARGV[6])
+redis.call('ZADD', KEYS[3], now, member)
+redis.call('HSET', KEYS[4], member, weight)
+local expired = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now - window)
+if #expired > 0 then
+    redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now - window)
+    redis.call('HDEL', KEYS[4], unpack(expired))
+end
+redis.call('PEXPIRE', KEYS[3], window)
+redis.call('PEXPIRE', KEYS[4], window)
+local total_weight = 0
+for _, member_weight in ipairs(redis.call('HVALS', KEYS[4])) do
+    total_weight = total_weight + tonumber(member_weight)
+end
+local share = weight / total_weight
+local member_capacity, member_rate = math.max(cost, capacity * share), rate * share
+
+local shared = refill(KEYS[1], capacity, rate)
+local own = refill(KEYS[2], member_capacity, member_rate)
+if shared < cost then
+    return math.ceil((cost - shared) / rate)
+end
+if shared < capacity * tonumber(ARGV[7]) and own < cost then
+    return math.ceil((cost - own) / member_rate)
+end
+store(KEYS[1], shared - cost, capacity, rate)
+store(KEYS[2], math.max(-member_capacity, own - cost), member_capacity, member_rate)
+return 0
+"""
 
 
 class RedisClient:
@@ -107,7 +328,7 @@ class RedisClient:
                     )
                     message_entities.append(message_entity)
                 except (json.JSONDecodeError, ValueError, KeyError) as e:
-                    print(f"❌ Error parsing cached message: {e}")
+                    logger.error("Error parsing cached message: %s", e)
                     continue
             
             return message_entities
@@ -137,69 +358,35 @@ class RedisClient:
         except Exception as e:
             raise RedisOperationError(f"Failed to extend chat messages TTL: {str(e)}")
     
-    async def store_user_event(self, user_wallet: str, event_data: dict) -> None:
+    async def store_user_event(self, user_wallet: str, event_data: dict, max_events: int, ttl: int) -> None:
         try:
-            event_type = event_data.get("event_type", "unknown")
-            type_events_key = f"user_events:{user_wallet}:{event_type}"
-            is_first_event = not await self._redis.exists(type_events_key)
-            await self._redis.lpush(type_events_key, json.dumps(event_data))
-        
-            type_limits = {
-                "deposit": 50, 
-                "spend": 50,   
-                "unknown": 50  
-            }
-            
-            limit = type_limits.get(event_type, 20)
-            
-            await self._redis.ltrim(type_events_key, 0, limit - 1)
-            
-            if is_first_event:
-                await self._redis.expire(type_events_key, 1800) 
-            
+            events_key = f"user_events:{user_wallet.lower()}"
+            # the id keeps otherwise identical events at the same timestamp from collapsing into one member
+            member = json.dumps({**event_data, "id": uuid.uuid4().hex})
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.zadd(events_key, {member: event_data["timestamp"]})
+                pipe.zremrangebyrank(events_key, 0, -max_events - 1)
+                pipe.expire(events_key, ttl)
+                await pipe.execute()
         except Exception as e:
             raise RedisOperationError(f"Failed to store user event: {str(e)}")
-    
-    async def _get_user_events_by_type(self, user_wallet: str, event_type: str) -> list[dict[str, Any]]:
+
+    async def drain_user_events(self, user_wallet: str, since: float | None, limit: int) -> list[dict[str, Any]]:
         try:
-            type_events_key = f"user_events:{user_wallet}:{event_type}"
-            
-            events_json = await self._redis.lrange(type_events_key, 0, -1)
+            members = await self._redis.eval(
+                DRAIN_USER_EVENTS_SCRIPT, 1, f"user_events:{user_wallet.lower()}",
+                "-inf" if since is None else f"({since!r}", limit
+            )
             events = []
-            for event_json in events_json:
+            for member in members:
                 try:
-                    event_data = json.loads(event_json)
-                    events.append(event_data)
+                    events.append(json.loads(member))
                 except json.JSONDecodeError:
                     continue
-            
             return events
         except Exception as e:
-            raise RedisOperationError(f"Failed to get user events by type: {str(e)}")
+            raise RedisOperationError(f"Failed to drain user events: {str(e)}")
 
-    async def get_user_deposit_events(self, user_wallet: str) -> list[DepositEvent]:
-        try:
-            events = await self._get_user_events_by_type(user_wallet, "deposit")
-            return [DepositEvent(**event["data"]) for event in events]
-        except Exception as e:
-            raise RedisOperationError(f"Failed to get user deposit events: {str(e)}")
-    
-    async def get_user_spend_events(self, user_wallet: str) -> list[SpendEvent]:
-        try:
-            events = await self._get_user_events_by_type(user_wallet, "spend")
-            return [SpendEvent(**event["data"]) for event in events]
-        except Exception as e:
-            raise RedisOperationError(f"Failed to get user spend events: {str(e)}")
-    
-    async def clear_user_events(self, user_wallet: str) -> None:
-        try:
-            event_types = ["deposit", "spend", "unknown"]
-            for event_type in event_types:
-                type_events_key = f"user_events:{user_wallet}:{event_type}"
-                await self._redis.delete(type_events_key)
-        except Exception as e:
-            raise RedisOperationError(f"Failed to clear user events: {str(e)}")
-    
     async def set_recent_event(self, user_wallet: str, timestamp: float, action_type: str, ttl: int = 10) -> None:
         try:
             redis_key = f"recent_event:{user_wallet}:{timestamp}:{action_type}"
@@ -217,3 +404,350 @@ class RedisClient:
         except Exception as e:
             raise RedisOperationError(f"Failed to check recent event existence: {str(e)}")
 
+    async def append_user_event(self, user_wallet: str, event_data: dict, maxlen: int, ttl: int) -> str:
+        try:
+            stream_key = f"user_event_stream:{user_wallet.lower()}"
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.xadd(stream_key, {"event": json.dumps(event_data)}, maxlen=maxlen, approximate=True)
+                pipe.expire(stream_key, ttl)
+                event_id, _ = await pipe.execute()
+            return event_id
+        except Exception as e:
+            raise RedisOperationError(f"Failed to append user event: {str(e)}")
+
+    async def read_user_events(self, user_wallet: str, last_event_id: str,
+                               count: int, block_ms: int | None = None) -> list[tuple[str, dict]]:
+        try:
+            streams = await self._redis.xread(
+                {f"user_event_stream:{user_wallet.lower()}": last_event_id}, count=count, block=block_ms
+            )
+            return [
+                (entry_id, json.loads(fields["event"]))
+                for _, entries in streams or []
+                for entry_id, fields in entries
+            ]
+        except Exception as e:
+            raise RedisOperationError(f"Failed to read user events: {str(e)}")
+
+    async def set_user_event_ack(self, user_wallet: str, client_id: str, event_id: str, ttl: int) -> None:
+        try:
+            await self._redis.set(f"user_event_ack:{user_wallet.lower()}:{client_id}", event_id, ex=ttl)
+        except Exception as e:
+            raise RedisOperationError(f"Failed to set user event ack: {str(e)}")
+
+    async def get_user_event_ack(self, user_wallet: str, client_id: str) -> str | None:
+        try:
+            return await self._redis.get(f"user_event_ack:{user_wallet.lower()}:{client_id}")
+        except Exception as e:
+            raise RedisOperationError(f"Failed to get user event ack: {str(e)}")
+
+    async def acquire_lease(self, name: str, ttl_ms: int) -> int | None:
+        try:
+            token = await self._redis.eval(
+                ACQUIRE_LEASE_SCRIPT, 2, f"lease:{name}", f"lease_fence:{name}", ttl_ms, 86400
+            )
+            return int(token) if token is not None else None
+        except Exception as e:
+            raise RedisOperationError(f"Failed to acquire lease: {str(e)}")
+
+    async def renew_lease(self, name: str, token: int, ttl_ms: int) -> bool:
+        try:
+            result = await self._redis.eval(RENEW_LEASE_SCRIPT, 1, f"lease:{name}", str(token), ttl_ms)
+            return bool(result)
+        except Exception as e:
+            raise RedisOperationError(f"Failed to renew lease: {str(e)}")
+
+    async def release_lease(self, name: str, token: int) -> bool:
+        try:
+            result = await self._redis.eval(RELEASE_LEASE_SCRIPT, 1, f"lease:{name}", str(token))
+            return bool(result)
+        except Exception as e:
+            raise RedisOperationError(f"Failed to release lease: {str(e)}")
+
+    async def check_lease(self, name: str, token: int) -> bool:
+        try:
+            return await self._redis.get(f"lease:{name}") == str(token)
+        except Exception as e:
+            raise RedisOperationError(f"Failed to check lease: {str(e)}")
+
+    async def is_lease_held(self, name: str) -> bool:
+        try:
+            return bool(await self._redis.exists(f"lease:{name}"))
+        except Exception as e:
+            raise RedisOperationError(f"Failed to check lease existence: {str(e)}")
+
+    async def enqueue_chat_job(self, stream: str, job_id: str, user_id: int, chat_id: int, payload: dict,
+                               max_depth: int, max_per_user: int, ttl: int) -> int:
+        # the busy check (chat lease or an unfinished latest job) and the enqueue happen in one step
+        try:
+            return int(await self._redis.eval(
+                ENQUEUE_CHAT_JOB_SCRIPT, 5,
+                stream, f"chat_jobs_active:{user_id}", f"chat_job:{job_id}",
+                f"chat_latest_job:{chat_id}", f"lease:chat:{chat_id}",
+                max_depth, max_per_user, job_id, json.dumps(payload), ttl
+            ))
+        except Exception as e:
+            raise RedisOperationError(f"Failed to enqueue chat job: {str(e)}")
+
+    async def ensure_consumer_group(self, stream: str, group: str) -> None:
+        try:
+            await self._redis.xgroup_create(stream, group, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise RedisOperationError(f"Failed to create consumer group: {str(e)}")
+        except Exception as e:
+            raise RedisOperationError(f"Failed to create consumer group: {str(e)}")
+
+    async def read_chat_jobs(self, stream: str, group: str, consumer: str,
+                             count: int, block_ms: int) -> list[tuple[str, dict]]:
+        try:
+            response = await self._redis.xreadgroup(group, consumer, {stream: ">"}, count=count, block=block_ms)
+            return [entry for _, entries in response or [] for entry in entries]
+        except Exception as e:
+            raise RedisOperationError(f"Failed to read chat jobs: {str(e)}")
+
+    async def claim_stale_chat_jobs(self, stream: str, group: str, consumer: str,
+                                    min_idle_ms: int, count: int) -> list[tuple[str, dict]]:
+        try:
+            response = await self._redis.xautoclaim(stream, group, consumer, min_idle_ms, count=count)
+            return [entry for entry in response[1] if entry and entry[1]]
+        except Exception as e:
+            raise RedisOperationError(f"Failed to claim stale chat jobs: {str(e)}")
+
+    async def finish_chat_job(self, stream: str, group: str, entry_id: str, user_id: int) -> None:
+        try:
+            await self._redis.eval(
+                FINISH_CHAT_JOB_SCRIPT, 2, stream, f"chat_jobs_active:{user_id}", group, entry_id
+            )
+        except Exception as e:
+            raise RedisOperationError(f"Failed to finish chat job: {str(e)}")
+
+    async def update_chat_job(self, job_id: str, fields: dict, ttl: int) -> None:
+        try:
+            redis_key = f"chat_job:{job_id}"
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.hset(redis_key, mapping=fields)
+                pipe.expire(redis_key, ttl)
+                pipe.publish(f"chat_job_events:{job_id}", json.dumps(fields))
+                await pipe.execute()
+        except Exception as e:
+            raise RedisOperationError(f"Failed to update chat job: {str(e)}")
+
+    async def get_chat_job(self, job_id: str) -> dict[str, str]:
+        try:
+            return await self._redis.hgetall(f"chat_job:{job_id}")
+        except Exception as e:
+            raise RedisOperationError(f"Failed to get chat job: {str(e)}")
+
+    async def get_chat_latest_job(self, chat_id: int) -> str | None:
+        try:
+            return await self._redis.get(f"chat_latest_job:{chat_id}")
+        except Exception as e:
+            raise RedisOperationError(f"Failed to get latest chat job: {str(e)}")
+
+    async def listen_chat_job(self, job_id: str, timeout: float):
+        pubsub = self._redis.pubsub()
+        try:
+            await pubsub.subscribe(f"chat_job_events:{job_id}")
+            yield await self.get_chat_job(job_id)
+            deadline = time.monotonic() + timeout
+            while (remaining := deadline - time.monotonic()) > 0:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+                if message is not None:
+                    yield json.loads(message["data"])
+        except RedisOperationError:
+            raise
+        except Exception as e:
+            raise RedisOperationError(f"Failed to listen for chat job updates: {str(e)}")
+        finally:
+            await pubsub.aclose()
+
+    async def claim_idempotency_key(self, key: str, fingerprint: str, owner: str, ttl: int) -> dict[str, str] | None:
+        try:
+            record = await self._redis.eval(
+                CLAIM_IDEMPOTENCY_KEY_SCRIPT, 1, f"idempotency:{key}", fingerprint, owner, ttl
+            )
+            return dict(zip(record[::2], record[1::2])) if record else None
+        except Exception as e:
+            raise RedisOperationError(f"Failed to claim idempotency key: {str(e)}")
+
+    async def complete_idempotency_key(self, key: str, owner: str, response: dict, ttl: int) -> bool:
+        try:
+            result = await self._redis.eval(
+                COMPLETE_IDEMPOTENCY_KEY_SCRIPT, 2, f"idempotency:{key}", f"idempotency_events:{key}",
+                owner, json.dumps(response), ttl
+            )
+            return bool(result)
+        except Exception as e:
+            raise RedisOperationError(f"Failed to complete idempotency key: {str(e)}")
+
+    async def release_idempotency_key(self, key: str, owner: str) -> bool:
+        try:
+            result = await self._redis.eval(
+                RELEASE_IDEMPOTENCY_KEY_SCRIPT, 2, f"idempotency:{key}", f"idempotency_events:{key}", owner
+            )
+            return bool(result)
+        except Exception as e:
+            raise RedisOperationError(f"Failed to release idempotency key: {str(e)}")
+
+    async def listen_idempotency_key(self, key: str, timeout: float):
+        # yields the record now and again after every change until the timeout
+        pubsub = self._redis.pubsub()
+        try:
+            await pubsub.subscribe(f"idempotency_events:{key}")
+            yield await self._redis.hgetall(f"idempotency:{key}")
+            deadline = time.monotonic() + timeout
+            while (remaining := deadline - time.monotonic()) > 0:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+                if message is not None:
+                    yield await self._redis.hgetall(f"idempotency:{key}")
+        except Exception as e:
+            raise RedisOperationError(f"Failed to listen for idempotency key updates: {str(e)}")
+        finally:
+            await pubsub.aclose()
+
+    async def reserve_credits(self, user_id: int, hold_id: str, amount: float, min_amount: float,
+                              balance: float, ttl: int) -> float | None:
+        try:
+            granted = await self._redis.eval(
+                RESERVE_CREDITS_SCRIPT, 1, f"credit_holds:{user_id}",
+                hold_id, amount, min_amount, balance, time.time(), ttl
+            )
+            return float(granted) if granted is not None else None
+        except Exception as e:
+            raise RedisOperationError(f"Failed to reserve credits: {str(e)}")
+
+    async def release_credits(self, user_id: int, hold_id: str) -> bool:
+        try:
+            result = await self._redis.eval(RELEASE_CREDITS_SCRIPT, 1, f"credit_holds:{user_id}", hold_id)
+            return bool(result)
+        except Exception as e:
+            raise RedisOperationError(f"Failed to release credits: {str(e)}")
+
+    async def get_tool_memory(self, chat_id: int) -> dict[str, dict]:
+        try:
+            entries = await self._redis.hgetall(f"chat_tool_memory:{chat_id}")
+            return {field: json.loads(value) for field, value in entries.items()}
+        except Exception as e:
+            raise RedisOperationError(f"Failed to get tool memory: {str(e)}")
+
+    async def store_tool_memory(self, chat_id: int, field: str, entry: dict, ttl: int) -> None:
+        try:
+            redis_key = f"chat_tool_memory:{chat_id}"
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.hset(redis_key, field, json.dumps(entry))
+                pipe.expire(redis_key, ttl)
+                await pipe.execute()
+        except Exception as e:
+            raise RedisOperationError(f"Failed to store tool memory: {str(e)}")
+
+    async def delete_tool_memory(self, chat_id: int, fields: list[str]) -> None:
+        try:
+            await self._redis.hdel(f"chat_tool_memory:{chat_id}", *fields)
+        except Exception as e:
+            raise RedisOperationError(f"Failed to delete tool memory: {str(e)}")
+
+    async def get_cached_response(self, cache_key: str) -> dict | None:
+        try:
+            cached = await self._redis.get(f"response_cache:{cache_key}")
+            return json.loads(cached) if cached else None
+        except Exception as e:
+            raise RedisOperationError(f"Failed to get cached response: {str(e)}")
+
+    async def set_cached_response(self, cache_key: str, value: dict, ttl: int) -> None:
+        try:
+            await self._redis.set(f"response_cache:{cache_key}", json.dumps(value), ex=ttl)
+        except Exception as e:
+            raise RedisOperationError(f"Failed to set cached response: {str(e)}")
+
+    async def get_cached_entity(self, key: str) -> tuple[dict | None, str]:
+        try:
+            cached, version = await self._redis.mget(f"entity_cache:{key}", f"entity_version:{key}")
+            return (json.loads(cached) if cached else None), version or "0"
+        except Exception as e:
+            raise RedisOperationError(f"Failed to get cached entity: {str(e)}")
+
+    async def set_cached_entity(self, key: str, value: dict, version: str, ttl: int) -> bool:
+        # skipped when the entity was invalidated after `version` was read, so a slow fill cannot resurrect stale data
+        try:
+            result = await self._redis.eval(
+                SET_CACHED_ENTITY_SCRIPT, 2, f"entity_cache:{key}", f"entity_version:{key}",
+                json.dumps(value), version, ttl
+            )
+            return bool(result)
+        except Exception as e:
+            raise RedisOperationError(f"Failed to set cached entity: {str(e)}")
+
+    async def invalidate_cached_entity(self, key: str, channel: str, version_ttl: int) -> None:
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.incr(f"entity_version:{key}")
+                pipe.expire(f"entity_version:{key}", version_ttl)
+                pipe.delete(f"entity_cache:{key}")
+                pipe.publish(channel, key)
+                await pipe.execute()
+        except Exception as e:
+            raise RedisOperationError(f"Failed to invalidate cached entity: {str(e)}")
+
+    async def listen_entity_invalidations(self, channel: str):
+        pubsub = self._redis.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            while True:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=PUBSUB_POLL_SECONDS)
+                if message is not None:
+                    yield message["data"]
+        except Exception as e:
+            raise RedisOperationError(f"Failed to listen for entity invalidations: {str(e)}")
+        finally:
+            await pubsub.aclose()
+
+    async def consume_rate_limit(self, keys: list[str], buckets: list[tuple[float, float]],
+                                 cost: float = 1) -> tuple[bool, int, int, int, int]:
+        try:
+            args = [cost]
+            for capacity, rate_per_ms in buckets:
+                args.extend((capacity, rate_per_ms))
+            allowed, tightest, remaining, reset_ms, retry_ms = await self._redis.eval(
+                CONSUME_RATE_LIMIT_SCRIPT, len(keys), *keys, *args
+            )
+            return bool(allowed), int(tightest) - 1, int(remaining), int(reset_ms), int(retry_ms)
+        except Exception as e:
+            raise RedisOperationError(f"Failed to consume rate limit: {str(e)}")
+
+    async def acquire_fair_share(self, name: str, member: str, weight: float, capacity: float,
+                                 rate_per_ms: float, active_window_ms: int, threshold: float,
+                                 cost: float = 1) -> int:
+        try:
+            retry_ms = await self._redis.eval(
+                FAIR_ACQUIRE_SCRIPT, 4,
+                f"rate_limit:upstream:{name}", f"rate_limit:upstream:{name}:{member}",
+                f"rate_limit:upstream:{name}:active", f"rate_limit:upstream:{name}:weights",
+                capacity, rate_per_ms, cost, member, weight, active_window_ms, threshold
+            )
+            return int(retry_ms)
+        except Exception as e:
+            raise RedisOperationError(f"Failed to acquire upstream share: {str(e)}")
+
+    async def increment_stats(self, name: str, values: dict[str, float]) -> None:
+        await self.increment_stats_batch({name: values})
+
+    async def increment_stats_batch(self, stats: dict[str, dict[str, float]]) -> None:
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for name, values in stats.items():
+                    for field, amount in values.items():
+                        if isinstance(amount, int):
+                            pipe.hincrby(f"stats:{name}", field, amount)
+                        else:
+                            pipe.hincrbyfloat(f"stats:{name}", field, amount)
+                await pipe.execute()
+        except Exception as e:
+            raise RedisOperationError(f"Failed to increment stats: {str(e)}")
+
+    async def get_stats(self, name: str) -> dict[str, float]:
+        try:
+            stats = await self._redis.hgetall(f"stats:{name}")
+            return {field: float(value) for field, value in stats.items()}
+        except Exception as e:
+            raise RedisOperationError(f"Failed to get stats: {str(e)}")
@@ -0,0 +1,110 @@
+import json
+import logging
+import os
+import time
+from typing import Any
+
+from .redis_client import RedisClient
+from constants import (
+    TOOL_MEMORY_TTL_SECONDS, TOOL_MEMORY_DEFAULT_TTL_SECONDS, TOOL_MEMORY_MAX_ENTRIES, TOOL_MEMORY_FACTS_TOKEN_BUDGET,
+    KNOWN_FACTS_PROMPT
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ToolMemory:
+    def __init__(self, redis_client: RedisClient, chat_id: int):
+        self.redis_client = redis_client
+        self.chat_id = chat_id
+        self.enabled = os.getenv("TOOL_MEMORY_ENABLED", "true").lower() == "true"
+        self.entries: dict[str, dict] | None = None
+
+    @staticmethod
+    def call_key(tool_name: str, tool_args: dict) -> str:
+        return f"{tool_name}:{json.dumps(tool_args, sort_keys=True, separators=(',', ':'), ensure_ascii=False)}"
+
+    @staticmethod
+    def ttl_for(tool_name: str) -> int:
+        return TOOL_MEMORY_TTL_SECONDS.get(tool_name.split("_", 1)[0], TOOL_MEMORY_DEFAULT_TTL_SECONDS)
+
+    async def load(self) -> dict[str, dict]:
+        # read once per turn; later calls in the turn see what this turn stored
+        if self.entries is not None:
+            return self.entries
+        self.entries = {}
+        if not self.enabled:
+            return self.entries
+        try:
+            stored = await self.redis_client.get_tool_memory(self.chat_id)
+        except Exception as e:
+            logger.warning("Failed to load tool memory for chat %s: %s", self.chat_id, e)
+            return self.entries
+        now = time.time()
+        fresh = sorted(
+            ((key, entry) for key, entry in stored.items() if entry.get("expires_at", 0) > now),
+            key=lambda item: item[1]["fetched_at"], reverse=True
+        )
+        self.entries = dict(fresh[:TOOL_MEMORY_MAX_ENTRIES])
+        stale = [key for key in stored if key not in self.entries]
+        if stale:
+            try:
+                await self.redis_client.delete_tool_memory(self.chat_id, stale)
+            except Exception as e:
+                logger.warning("Failed to prune tool memory for chat %s: %s", self.chat_id, e)
+        return self.entries
+
+    async def lookup(self, tool_name: str, tool_args: dict) -> str | None:
+        if not self.enabled:
+            return None
+        entry = (await self.load()).get(self.call_key(tool_name, tool_args))
+        return entry["result"] if entry is not None and entry["expires_at"] > time.time() else None
+
+    async def recall(self, tool_name: str, tool_args: dict) -> str | None:
+        if not self.enabled:
+            return None
+        result = await self.lookup(tool_name, tool_args)
+        await self._record_stats({"hits" if result is not None else "misses": 1})
+        return result
+
+    async def remember(self, tool_name: str, tool_args: dict, result: str) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        key = self.call_key(tool_name, tool_args)
+        entry = {
+            "tool": tool_name,
+            "args": tool_args,
+            "result": result,
+            "fetched_at": now,
+            "expires_at": now + self.ttl_for(tool_name)
+        }
+        (await self.load())[key] = entry
+        try:
+            await self.redis_client.store_tool_memory(
+                self.chat_id, key, entry, max(TOOL_MEMORY_DEFAULT_TTL_SECONDS, *TOOL_MEMORY_TTL_SECONDS.values())
+            )
+        except Exception as e:
+            logger.warning("Failed to store tool memory for chat %s: %s", self.chat_id, e)
+
+    async def known_facts(self, token_budget: int = TOOL_MEMORY_FACTS_TOKEN_BUDGET) -> str | None:
+        # newest results first, until the budget runs out
+        entries = sorted((await self.load()).values(), key=lambda entry: entry["fetched_at"], reverse=True)
+        facts, used = [], 0
+        for entry in entries:
+            fact = f"- {entry['tool']}({self._format_args(entry['args'])}): {entry['result']}"
+            if used + len(fact) // 4 > token_budget:
+                continue
+            facts.append(fact)
+            used += len(fact) // 4
+        return KNOWN_FACTS_PROMPT.format(facts="\n".join(facts)) if facts else None
+
+    @staticmethod
+    def _format_args(tool_args: dict[str, Any]) -> str:
+        return ", ".join(f"{name}={json.dumps(value, ensure_ascii=False)}" for name, value in tool_args.items())
+
+    async def _record_stats(self, values: dict[str, float]) -> None:
+        try:
+            await self.redis_client.increment_stats("tool_memory", values)
+        except Exception as e:
+            logger.warning("Failed to record tool memory stats: %s", e)
@@ -0,0 +1,44 @@
+import asyncio
+import logging
+import os
+import random
+import time
+
+from .redis_client import RedisClient
+from constants import (
+    UPSTREAM_RATE_LIMITS, UPSTREAM_FAIR_SHARE_THRESHOLD, UPSTREAM_ACTIVE_WINDOW_SECONDS, UPSTREAM_MAX_WAIT_SECONDS
+)
+from exceptions import UpstreamRateLimitError
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamLimiter:
+    def __init__(self, redis_client: RedisClient, member: str, weight: float = 1.0):
+        self.redis_client = redis_client
+        self.member = member
+        self.weight = weight
+        self.enabled = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+        self.max_wait = float(os.getenv("UPSTREAM_MAX_WAIT_SECONDS", UPSTREAM_MAX_WAIT_SECONDS))
+
+    async def acquire(self, upstream: str) -> None:
+        if not self.enabled or upstream not in UPSTREAM_RATE_LIMITS:
+            return
+        capacity, window = UPSTREAM_RATE_LIMITS[upstream]
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            try:
+                retry_ms = await self.redis_client.acquire_fair_share(
+                    upstream, self.member, self.weight, capacity, capacity / (window * 1000),
+                    UPSTREAM_ACTIVE_WINDOW_SECONDS * 1000, UPSTREAM_FAIR_SHARE_THRESHOLD
+                )
+            except Exception as e:
+                logger.warning("Upstream limiter unavailable for %s, proceeding: %s", upstream, e)
+                return
+            if retry_ms <= 0:
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise UpstreamRateLimitError(f"{upstream} is busy, retry later")
+            # jitter keeps waiters that were denied together from retrying together
+            await asyncio.sleep(min(remaining, retry_ms / 1000 * random.uniform(1.0, 1.5)))
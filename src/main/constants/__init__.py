@@ -1,3 +1,7 @@
 from .auth_constants import *
 from .llm_constants import *
-from .indexer_constants import *
\ No newline at end of file
+from .indexer_constants import *
+from .chat_constants import *
+from .logging_constants import *
+from .rate_limit_constants import *
+from .circuit_breaker_constants import *
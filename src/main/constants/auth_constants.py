@@ -1,3 +1,7 @@
 SIGN_MESSAGE = "WELCOME TO BASEDAGENT.IO PLATFORM"
 
 
+SIGNATURE_POOL_WORKERS = 2
+VERIFIED_SIGNATURE_CACHE_SIZE = 10000
+VERIFIED_SIGNATURE_CACHE_TTL_SECONDS = 600
+INITIAL_CHAT_CREDITS = 2.0
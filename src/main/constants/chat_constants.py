@@ -0,0 +1,51 @@
+CHAT_LEASE_TTL_SECONDS = 90
+CHAT_LEASE_RENEW_INTERVAL_SECONDS = 30
+
+CHAT_JOB_STREAM = "chat_jobs"
+CHAT_JOB_GROUP = "chat_workers"
+CHAT_JOB_MAX_QUEUE_DEPTH = 500
+CHAT_JOB_MAX_PER_USER = 2
+CHAT_JOB_TTL_SECONDS = 3600
+CHAT_JOB_CLAIM_IDLE_MS = 120000
+# blocking reads stay well under the Redis client socket timeout (5s)
+CHAT_JOB_READ_BLOCK_MS = 2000
+CHAT_WORKER_CONCURRENCY = 8
+
+BASE_MESSAGE_COST = 0.1
+MESSAGE_COST_ESTIMATE = 0.7
+CREDIT_HOLD_TTL_SECONDS = 180
+CHAT_RESPONSE_DEADLINE_SECONDS = 60
+
+RESPONSE_CACHE_SIMILARITY_THRESHOLD = 0.5
+RESPONSE_CACHE_INDEX_SIZE = 2000
+RESPONSE_CACHE_TTL_SECONDS = {
+    "realtime": 120,
+    "social": 3600,
+    "static": 86400,
+}
+RESPONSE_CACHE_REALTIME_KEYWORDS = (
+    "floor", "price", "volume", "listing", "listed", "sale", "sales", "offer", "bid",
+    "trending", "top", "today", "now", "current", "latest", "24h", "balance", "holders",
+)
+RESPONSE_CACHE_SOCIAL_KEYWORDS = (
+    "score", "followers", "follower", "twitter", "tweet", "influence", "account", "x.com",
+)
+
+# Idempotency-Key records for message requests: claimed while running, then the stored response
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+IDEMPOTENCY_IN_FLIGHT_TTL_SECONDS = 180
+IDEMPOTENCY_RESPONSE_TTL_SECONDS = 86400
+IDEMPOTENCY_WAIT_SECONDS = 75
+
+DEFAULT_CHAT_TITLE = "New Chat"
+FALLBACK_CHAT_TITLE_WORDS = 4
+FALLBACK_CHAT_TITLE_LENGTH = 30
+
+# Redis stats hashes (stats:{name}) exported on /metrics
+METRICS_STATS_NAMES = ("response_cache", "llm_routing", "tool_schemas", "tool_results", "tool_memory")
+
+# Read-through cache for users and chat metadata: per-process L1 in front of Redis L2
+ENTITY_CACHE_L1_SIZE = 10000
+ENTITY_CACHE_L1_TTL_SECONDS = 5
+ENTITY_CACHE_L2_TTL_SECONDS = 300
+ENTITY_CACHE_CHANNEL = "entity_cache_invalidations"
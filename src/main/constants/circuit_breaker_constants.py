@@ -0,0 +1,18 @@
+# Per-provider circuit breakers over a rolling window of recent calls
+CIRCUIT_BREAKER_WINDOW_SIZE = 20
+CIRCUIT_BREAKER_MIN_CALLS = 5
+CIRCUIT_BREAKER_FAILURE_RATE = 0.5
+# calls slower than this count as failures even when they succeed
+CIRCUIT_BREAKER_SLOW_CALL_SECONDS = 10
+# an open circuit waits this long before a probe, doubling after every failed probe
+CIRCUIT_BREAKER_OPEN_SECONDS = 30
+CIRCUIT_BREAKER_MAX_OPEN_SECONDS = 300
+CIRCUIT_BREAKER_HALF_OPEN_PROBES = 1
+
+# Bulkheads: calls in flight per provider, anything above is turned away instead of queued
+PROVIDER_BULKHEADS = {
+    "opensea": 8,
+    "tweetscout": 16,
+    "indexer": 2,
+}
+DEFAULT_PROVIDER_BULKHEAD = 8
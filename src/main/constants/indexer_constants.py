@@ -13,3 +13,18 @@ TOKEN_CA_MAPPING = {
 }
 
 DEFAULT_QUERY_INTERVAL_SECONDS = 30
+INDEXER_LEADER_LEASE = "indexer_leader"
+
+# Per-wallet push stream: a short replay buffer for SSE clients plus their acknowledged positions
+EVENT_STREAM_MAXLEN = 200
+EVENT_STREAM_TTL_SECONDS = 86400
+EVENT_STREAM_READ_COUNT = 50
+# blocking reads stay well under the Redis client socket timeout (5s); an empty read just loops
+EVENT_STREAM_BLOCK_MS = 2000
+EVENT_ID_PATTERN = r"\d+-\d+"
+EVENT_ACK_TTL_SECONDS = 7 * 86400
+
+# Per-wallet poll buffer drained by /events/all
+USER_EVENTS_MAX = 100
+USER_EVENTS_TTL_SECONDS = 1800
+USER_EVENTS_DRAIN_LIMIT = 100
@@ -1,5 +1,6 @@
 MODEL = "gpt-5-nano"
 MULTICALL_DEPTH = 3
+NO_RESPONSE_MESSAGE = "No response generated"
 
 GENERATE_CHAT_TITLE_PROMPT = "Generate a title for the chat based on the messages in the chat. Return only the title up to 3 words and 20 characters and in English, no other text."
 
@@ -95,3 +96,96 @@ PROMPT_MAP = {
     "project_scoring": 3,
     "x_scoring": 4,
 }
+
+TOOL_ROUTING_KEYWORDS = (
+    "floor", "price", "prices", "volume", "collection", "collections", "nft", "nfts", "listing",
+    "listings", "sale", "sales", "offer", "offers", "holder", "holders", "mint", "minted", "trait",
+    "traits", "wallet", "portfolio", "token", "tokens", "balance", "balances", "opensea", "trending",
+    "top", "rank", "ranking", "stats", "twitter", "tweet", "tweets", "follower", "followers", "score",
+    "influence", "influencer", "account", "handle", "profile", "item", "items", "activity", "chain",
+)
+TOOL_ROUTING_FOLLOW_UP_WORDS = 6
+
+TOOL_SCHEMA_CACHE_TTL_SECONDS = 600
+# Tool name prefixes exposed to the model per PROMPT_MAP task; tasks not listed get every tool
+TASK_TOOL_PREFIXES = {
+    "nft_scoring": (
+        "opensea_search_collections", "opensea_get_collection", "opensea_get_top_collections",
+        "opensea_get_trending_collections",
+    ),
+    "nft_scraping": (
+        "opensea_search_collections", "opensea_get_collection", "opensea_search_items",
+        "opensea_get_item", "opensea_get_top_collections", "opensea_get_trending_collections",
+    ),
+    "x_scoring": (
+        "tweetscout_",
+    ),
+}
+TOOL_RESULT_TOKEN_BUDGET = 1200
+TOOL_RESULT_MAX_LIST_ITEMS = 10
+TOOL_RESULT_MAX_STRING_LENGTH = 400
+# Fields that never help the model: media, styling and pagination noise
+TOOL_RESULT_DROP_KEYS = frozenset((
+    "avatar", "banner", "image", "image_url", "imageUrl", "display_image_url", "banner_image_url",
+    "profile_image_url", "original_image_url", "animation_url", "thumbnail", "thumbnail_url",
+    "background_color", "icon", "logo", "can_dm", "cursor", "next", "previous",
+))
+# Per-tool field projection applied to every dict in the result; tools not listed keep all fields
+TOOL_RESULT_FIELDS = {
+    "tweetscout_get_info": (
+        "id", "name", "screen_name", "description", "followers_count", "friends_count",
+        "register_date", "tweets_count", "verified",
+    ),
+    "tweetscout_get_top_followers": (
+        "id", "name", "screeName", "screen_name", "followersCount", "followers_count", "score",
+    ),
+}
+# Speculative prefetch: (pattern, tool, argument) for calls the model predictably makes for entities in the message
+PREFETCH_RULES = (
+    (r"(?<![\w@/])@([A-Za-z0-9_]{1,15})\b", "tweetscout_get_info", "user_handle"),
+    (
+        r"(?<![\w.-])(?:www\.|mobile\.)?(?:x|twitter)\.com/"
+        r"(?!(?:i|home|search|intent|explore|hashtag|share|settings|messages|notifications|compose)\b)"
+        r"([A-Za-z0-9_]{1,15})\b",
+        "tweetscout_get_info", "user_handle"
+    ),
+    (r"\b(0x[0-9a-fA-F]{40})\b", "opensea_get_profile", "address"),
+    (r"(?<![\w.-])(?:www\.)?opensea\.io/collection/([a-z0-9_-]+)", "opensea_get_collection", "slug"),
+)
+PREFETCH_MAX_CALLS = 3
+# Chat-scoped memory of compacted tool results: identical calls reuse it and later turns see it as known facts
+TOOL_MEMORY_TTL_SECONDS = {
+    "opensea": 300,
+    "tweetscout": 3600,
+}
+TOOL_MEMORY_DEFAULT_TTL_SECONDS = 300
+TOOL_MEMORY_MAX_ENTRIES = 20
+TOOL_MEMORY_FACTS_TOKEN_BUDGET = 1500
+KNOWN_FACTS_PROMPT = (
+    "Known facts from tools already called in this chat. Use them instead of calling the same tool "
+    "with the same arguments again:\n{facts}"
+)
+
+# Shared OpenAI client: adaptive concurrency (AIMD) driven by 429s and the x-ratelimit-* headers
+OPENAI_INITIAL_CONCURRENCY = 8
+OPENAI_MIN_CONCURRENCY = 1
+OPENAI_MAX_CONCURRENCY = 64
+OPENAI_MAX_ATTEMPTS = 4
+OPENAI_BACKOFF_BASE_SECONDS = 0.5
+OPENAI_BACKOFF_MAX_SECONDS = 20
+OPENAI_RATE_LIMIT_HEADROOM = 0.1
+# lower runs first when requests queue for a slot
+OPENAI_PRIORITIES = {
+    "answer": 0,
+    "title": 1,
+}
+
+# Deadline budgeting for the tool loop: tool rounds stop early enough to leave time for a final answer
+FINAL_SYNTHESIS_RESERVE_SECONDS = 12
+MIN_TOOL_ROUND_SECONDS = 4
+LLM_ROUND_BUDGET_SHARE = 0.5
+MIN_TOOL_TIMEOUT_SECONDS = 2
+DEADLINE_SYNTHESIS_PROMPT = (
+    "Time is up for data gathering. Answer now using only the tool results above; "
+    "say briefly which parts could not be checked."
+)
@@ -0,0 +1,2 @@
+LOG_MAX_MESSAGE_LENGTH = 2000
+LOG_DEBUG_SAMPLE_RATE = 0.1
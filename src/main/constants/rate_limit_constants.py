@@ -0,0 +1,19 @@
+# Token buckets as (capacity, window_seconds): a full bucket refills over one window
+RATE_LIMIT_POLICIES = {
+    "user": (120, 60),
+    "chat_create": (20, 3600),
+    "chat_message": (10, 60),
+    "portfolio": (10, 60),
+    "auth": (20, 60),
+    "email_code": (5, 600),
+}
+
+# Shared upstream quotas, split fairly between the users competing for them
+UPSTREAM_RATE_LIMITS = {
+    "openai": (500, 60),
+    "tweetscout": (60, 60),
+    "opensea": (120, 60),
+}
+UPSTREAM_FAIR_SHARE_THRESHOLD = 0.5
+UPSTREAM_ACTIVE_WINDOW_SECONDS = 60
+UPSTREAM_MAX_WAIT_SECONDS = 10
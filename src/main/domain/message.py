@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 
 
-from sqlalchemy import DateTime,  ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import DateTime,  ForeignKey, Text, Index, Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -14,6 +14,9 @@ if TYPE_CHECKING:
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_chat_id_created_at", "chat_id", "created_at"),
+    )
     
     content: Mapped[str] = mapped_column(Text, nullable=False)
     role: Mapped[MessageRole] = mapped_column(SQLEnum(MessageRole), nullable=False)
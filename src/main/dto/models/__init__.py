@@ -4,3 +4,4 @@ from .chat_dto import *
 from .message_dto import *
 from .indexer_dto import *
 from .event_dto import *
+from .rate_limit_dto import *
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class DepositEvent(BaseModel):
@@ -18,3 +18,8 @@ class SpendEvent(BaseModel):
     entity_id: int
     timestamp: float
     event_type: str = "spend"
+
+
+class EventAckRequest(BaseModel):
+    client_id: str = Field(min_length=1, max_length=64)
+    event_id: str = Field(pattern=r"^\d+-\d+$")
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_seconds: int
+    retry_after_seconds: int
+    policy: str
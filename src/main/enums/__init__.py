@@ -1 +1,2 @@
 from .message_roles import MessageRole
+from .circuit_states import CircuitState
@@ -9,3 +9,8 @@ from .llm_exceptions import *
 from .indexer_exceptions import *
 from .base_exceptions import *
 from .mcp_exceptions import *
+from .db_exceptions import *
+from .rate_limit_exceptions import *
+from .upstream_exceptions import *
+from .idempotency_exceptions import *
+from .event_exceptions import *
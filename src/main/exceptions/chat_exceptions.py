@@ -22,4 +22,15 @@ class InsufficientCreditsError(ChatError):
 
 
 class PendingUserError(ChatError):
-    pass
\ No newline at end of file
+    pass
+
+class ChatLeaseLostError(ChatError):
+    pass
+
+
+class ChatJobNotFoundError(ChatError):
+    pass
+
+
+class ChatQueueFullError(ChatError):
+    pass
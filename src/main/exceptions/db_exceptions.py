@@ -0,0 +1,9 @@
+from .base_exceptions import BaseAppException
+
+
+class DatabaseError(BaseAppException):
+    pass
+
+
+class SchemaVersionMismatchError(DatabaseError):
+    pass
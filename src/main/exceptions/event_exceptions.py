@@ -0,0 +1,5 @@
+from .base_exceptions import BaseAppException
+
+
+class InvalidEventIdError(BaseAppException):
+    pass
@@ -0,0 +1,17 @@
+from .base_exceptions import BaseAppException
+
+
+class IdempotencyError(BaseAppException):
+    pass
+
+
+class InvalidIdempotencyKeyError(IdempotencyError):
+    pass
+
+
+class IdempotencyKeyReusedError(IdempotencyError):
+    pass
+
+
+class IdempotencyKeyInProgressError(IdempotencyError):
+    pass
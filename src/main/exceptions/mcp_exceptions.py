@@ -1,4 +1,8 @@
 from .base_exceptions import BaseAppException
 
 class MCPResponseError(BaseAppException):
-    pass
\ No newline at end of file
+    pass
+
+
+class MCPProviderError(BaseAppException):
+    pass
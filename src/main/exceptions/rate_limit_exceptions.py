@@ -0,0 +1,13 @@
+from .base_exceptions import BaseAppException
+
+
+class RateLimitError(BaseAppException):
+    pass
+
+
+class RateLimitExceededError(RateLimitError):
+    pass
+
+
+class UpstreamRateLimitError(RateLimitError):
+    pass
@@ -0,0 +1,13 @@
+from .base_exceptions import BaseAppException
+
+
+class UpstreamUnavailableError(BaseAppException):
+    pass
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    pass
+
+
+class BulkheadFullError(UpstreamUnavailableError):
+    pass
@@ -0,0 +1,12 @@
+import asyncio
+import sys
+from pathlib import Path
+
+current_dir = Path(__file__).parent
+sys.path.insert(0, str(current_dir))
+
+from utils.start_utils import run_indexer
+
+
+if __name__ == '__main__':
+    asyncio.run(run_indexer())
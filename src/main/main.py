@@ -1,4 +1,3 @@
-import asyncio
 import sys
 from pathlib import Path
 
@@ -8,9 +7,10 @@ sys.path.insert(0, str(current_dir))
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
-from routers import auth_router, user_router, chat_router, events_router
+from routers import auth_router, user_router, chat_router, events_router, metrics_router
 from utils.start_utils import lifespan, run_app
 from utils.global_error_handler import global_exception_handler
+from utils.rate_limit_utils import RateLimitHeadersMiddleware
 from exceptions import BaseAppException
 
 app = FastAPI(
@@ -22,13 +22,17 @@ app.include_router(auth_router)
 app.include_router(user_router)
 app.include_router(chat_router)
 app.include_router(events_router)
+app.include_router(metrics_router)
 
+app.add_middleware(RateLimitHeadersMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "RateLimit-Policy", "Retry-After",
+                    "Idempotent-Replayed"],
 )
 # app.add_exception_handler(BaseAppException, global_exception_handler)
 app.add_exception_handler(Exception, global_exception_handler)
@@ -44,4 +48,4 @@ async def health_check():
 
 
 if __name__ == '__main__':
-    asyncio.run(run_app())
+    run_app()
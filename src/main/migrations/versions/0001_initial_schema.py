@@ -0,0 +1,77 @@
+"""initial schema with chat/message lookup indexes
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00.000000
+
+Databases that were bootstrapped by the old `create_all` startup already
+have the tables, so they are only created when missing and the revision
+just adds the indexes on top.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    existing_tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing_tables:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("wallet_address", sa.String(length=42), nullable=False),
+            sa.Column("email", sa.String(length=255), nullable=True),
+            sa.Column("remaining_chat_credits", sa.Float(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("wallet_address"),
+            sa.UniqueConstraint("email"),
+        )
+
+    if "chats" not in existing_tables:
+        op.create_table(
+            "chats",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("title", sa.String(length=255), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+    if "messages" not in existing_tables:
+        op.create_table(
+            "messages",
+            sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column("content", sa.Text(), nullable=False),
+            sa.Column("role", sa.Enum("USER", "AI", name="messagerole"), nullable=False),
+            sa.Column("chat_id", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["chat_id"], ["chats.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+    op.create_index(
+        "ix_chats_user_id_created_at", "chats", ["user_id", "created_at"],
+        if_not_exists=True
+    )
+    op.create_index(
+        "ix_messages_chat_id_created_at", "messages", ["chat_id", "created_at"],
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_messages_chat_id_created_at", table_name="messages")
+    op.drop_index("ix_chats_user_id_created_at", table_name="chats")
+    op.drop_table("messages")
+    op.drop_table("chats")
+    op.drop_table("users")
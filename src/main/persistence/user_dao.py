@@ -1,4 +1,5 @@
 from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
 
 
 from domain import User
@@ -33,6 +34,22 @@ class UserDAO:
             await session.refresh(user)
             return self._to_entity(user)
 
+    async def get_or_create_by_wallet_address(self, wallet_address: str, initial_credits: float) -> UserEntity:
+        # the no-op DO UPDATE makes RETURNING yield the existing row, so this is always one round trip
+        statement = insert(User).values(
+            wallet_address=wallet_address.lower(),
+            remaining_chat_credits=initial_credits
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[User.wallet_address],
+            set_={"wallet_address": statement.excluded.wallet_address}
+        ).returning(User)
+        async for session in self.db_helper.session_dependency():
+            result = await session.execute(statement)
+            user = result.scalar_one()
+            await session.commit()
+            return self._to_entity(user)
+
     async def update(self, user: UserEntity) -> None:
         async for session in self.db_helper.session_dependency():
             existing_user = await session.get(User, user.id)
@@ -44,6 +61,30 @@ class UserDAO:
                 existing_user.remaining_chat_credits = user.remaining_chat_credits
             await session.commit()
 
+    async def add_balance_by_id(self, user_id: int, delta: float) -> float | None:
+        async for session in self.db_helper.session_dependency():
+            result = await session.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(remaining_chat_credits=User.remaining_chat_credits + delta)
+                .returning(User.remaining_chat_credits)
+            )
+            new_balance = result.scalar_one_or_none()
+            await session.commit()
+            return new_balance
+
+    async def add_balance_by_wallet_address(self, wallet_address: str, delta: float) -> tuple[int, float] | None:
+        async for session in self.db_helper.session_dependency():
+            result = await session.execute(
+                update(User)
+                .where(User.wallet_address == wallet_address.lower())
+                .values(remaining_chat_credits=User.remaining_chat_credits + delta)
+                .returning(User.id, User.remaining_chat_credits)
+            )
+            row = result.one_or_none()
+            await session.commit()
+            return (row.id, row.remaining_chat_credits) if row else None
+
     async def get_by_id(self, user_id: int) -> UserEntity | None:
         async for session in self.db_helper.session_dependency():
             result = await session.execute(
@@ -2,3 +2,4 @@ from .auth_router import auth_router
 from .user_router import user_router
 from .chat_router import chat_router
 from .events_router import events_router
+from .metrics_router import metrics_router
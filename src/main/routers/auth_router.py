@@ -7,18 +7,19 @@ from dto import (
     AccessData)
 from services import AuthService
 from utils.auth_utils import get_access_data
+from utils.rate_limit_utils import ip_rate_limit
 
 auth_router = APIRouter(prefix="/auth")
 
 
-@auth_router.post("/authenticate")
+@auth_router.post("/authenticate", dependencies=[Depends(ip_rate_limit("auth"))])
 async def authenticate(auth_request: WalletAuthRequest,
                        auth_service: AuthService = Depends(AuthService.get_instance)) -> TokenResponse:
     token_info = await auth_service.authenticate(auth_request)
     return token_info
 
 
-@auth_router.post("/send-email-code")
+@auth_router.post("/send-email-code", dependencies=[Depends(ip_rate_limit("email_code"))])
 async def send_email_code(email_request: SendEmailCodeRequest,
                           auth_service: AuthService = Depends(AuthService.get_instance)) -> JSONResponse:
     await auth_service.send_email_verification_code(email_request)
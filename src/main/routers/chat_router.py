@@ -1,13 +1,16 @@
+import json
 import time
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
+from sse_starlette.sse import EventSourceResponse
 
 from dto import AccessData
 from dto import MessageCreate, MessageResponse
 from dto import MessageConverter
-from services import ChatService
+from services import ChatService, ChatJobService, IdempotencyService
 from utils.auth_utils import get_access_data
+from utils.rate_limit_utils import rate_limit
 
 chat_router = APIRouter(prefix="/chat")
 
@@ -19,7 +22,7 @@ async def get_user_chats(limit: int = Query(50, ge=1, le=100),
     chats = await chat_service.get_user_chats(current_user.sub, limit, offset)
     return JSONResponse(content=jsonable_encoder(chats, exclude_none=True))
 
-@chat_router.post("/new")
+@chat_router.post("/new", dependencies=[Depends(rate_limit("chat_create"))])
 async def create_chat(current_user: AccessData = Depends(get_access_data),
                       chat_service: ChatService = Depends(ChatService.get_instance)) -> JSONResponse:
     chat = await chat_service.create(current_user.sub)
@@ -33,13 +36,35 @@ async def get_task_types(current_user: AccessData = Depends(get_access_data),
     return JSONResponse(content=jsonable_encoder(task_types, exclude_none=True))
 
 
+@chat_router.get("/jobs/{job_id}")
+async def get_chat_job(job_id: str,
+                       current_user: AccessData = Depends(get_access_data),
+                       chat_job_service: ChatJobService = Depends(ChatJobService.get_instance)) -> JSONResponse:
+    job = await chat_job_service.get_job(job_id, current_user.sub)
+    return JSONResponse(content=job)
+
+
+@chat_router.get("/jobs/{job_id}/stream")
+async def stream_chat_job(job_id: str,
+                          current_user: AccessData = Depends(get_access_data),
+                          chat_job_service: ChatJobService = Depends(ChatJobService.get_instance)) -> EventSourceResponse:
+    await chat_job_service.get_job(job_id, current_user.sub)
+
+    async def job_events():
+        async for job in chat_job_service.stream_job(job_id, current_user.sub):
+            yield {"event": job["status"], "data": json.dumps(job)}
+
+    return EventSourceResponse(job_events())
+
+
 @chat_router.get("/{chat_id}/status")
 async def get_chat_status(chat_id: int,
                          current_user: AccessData = Depends(get_access_data),
-                         chat_service: ChatService = Depends(ChatService.get_instance)) -> JSONResponse:    
-    is_pending = await chat_service.is_chat_pending(chat_id)
+                         chat_job_service: ChatJobService = Depends(ChatJobService.get_instance)) -> JSONResponse:    
+    is_pending = await chat_job_service.is_chat_busy(chat_id)
+    job = await chat_job_service.get_chat_latest_job(chat_id, current_user.sub)
     
-    return JSONResponse(content={"is_pending": is_pending})
+    return JSONResponse(content=jsonable_encoder({"is_pending": is_pending, "job": job}, exclude_none=True))
 
 @chat_router.get("/{chat_id}/messages")
 async def get_chat_messages(chat_id: int,
@@ -51,31 +76,60 @@ async def get_chat_messages(chat_id: int,
     messages = await chat_service.get_chat_messages(chat_id, limit, offset)
     return JSONResponse(content=jsonable_encoder(messages, exclude_none=True))
 
-@chat_router.post("/{chat_id}/message/new")
+@chat_router.post("/{chat_id}/message/new", dependencies=[Depends(rate_limit("chat_message"))])
 async def process_message(message_create: MessageCreate,
+                          background: bool = Query(False),
+                          idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
                           current_user: AccessData = Depends(get_access_data),
-                          chat_service: ChatService = Depends(ChatService.get_instance)) -> JSONResponse:
-    message = MessageConverter.from_pydantic_to_entity(message_create)
-    response, new_balance = await chat_service.process_user_message(current_user.sub, message)
-    return JSONResponse(
-        content=jsonable_encoder(
-            MessageResponse(message=response, remaining_credits=new_balance),
-            exclude_none=True
-        )
+                          chat_service: ChatService = Depends(ChatService.get_instance),
+                          chat_job_service: ChatJobService = Depends(ChatJobService.get_instance),
+                          idempotency_service: IdempotencyService = Depends(IdempotencyService.get_instance)) -> JSONResponse:
+    return await _process_message(
+        message_create, None, background, idempotency_key, current_user,
+        chat_service, chat_job_service, idempotency_service
     )
 
-@chat_router.post("/{chat_id}/message/new/{task_name}")
+@chat_router.post("/{chat_id}/message/new/{task_name}", dependencies=[Depends(rate_limit("chat_message"))])
 async def process_message_task(message_create: MessageCreate,
                                task_name: str,
+                               background: bool = Query(False),
+                               idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
                                current_user: AccessData = Depends(get_access_data),
-                               chat_service: ChatService = Depends(ChatService.get_instance)) -> JSONResponse:
+                               chat_service: ChatService = Depends(ChatService.get_instance),
+                               chat_job_service: ChatJobService = Depends(ChatJobService.get_instance),
+                               idempotency_service: IdempotencyService = Depends(IdempotencyService.get_instance)) -> JSONResponse:
+    return await _process_message(
+        message_create, task_name, background, idempotency_key, current_user,
+        chat_service, chat_job_service, idempotency_service
+    )
+
+async def _process_message(message_create: MessageCreate,
+                           task_name: str | None,
+                           background: bool,
+                           idempotency_key: str | None,
+                           current_user: AccessData,
+                           chat_service: ChatService,
+                           chat_job_service: ChatJobService,
+                           idempotency_service: IdempotencyService) -> JSONResponse:
     message = MessageConverter.from_pydantic_to_entity(message_create)
-    response, new_balance = await chat_service.process_user_message(current_user.sub, message, task_name)
+
+    async def handle() -> tuple[int, dict]:
+        if background:
+            job = await chat_job_service.enqueue_message(current_user.sub, message, task_name)
+            return 202, job
+        response, new_balance = await chat_service.process_user_message(current_user.sub, message, task_name)
+        return 200, jsonable_encoder(MessageResponse(message=response, remaining_credits=new_balance), exclude_none=True)
+
+    # a retry with the same key gets the stored response, or waits for the original request to finish
+    status_code, content, replayed = await idempotency_service.execute(
+        current_user.sub, idempotency_key,
+        {**message_create.model_dump(), "task_name": task_name, "background": background},
+        handle
+    )
     return JSONResponse(
-        content=jsonable_encoder(
-            MessageResponse(message=response, remaining_credits=new_balance),
-            exclude_none=True
-        )
+        status_code=status_code,
+        content=content,
+        headers={"Idempotent-Replayed": "true"} if replayed else None
     )
 
 @chat_router.get("/{chat_id}")
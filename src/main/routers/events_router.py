@@ -1,23 +1,54 @@
-import time
-from fastapi import APIRouter, Depends
-from dto import DepositEvent, SpendEvent
+import json
+import re
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import JSONResponse
+from sse_starlette.sse import EventSourceResponse
+
+from dto import DepositEvent, SpendEvent, EventAckRequest
 from utils.auth_utils import get_access_data
 from dto import AccessData
 from services import NotificationService
+from constants import USER_EVENTS_DRAIN_LIMIT, EVENT_ID_PATTERN
+from exceptions import InvalidEventIdError
 
 events_router = APIRouter(prefix="/events")
 
 
 @events_router.get("/all")
 async def get_all_user_events(
+    since: float | None = Query(None),
+    limit: int = Query(USER_EVENTS_DRAIN_LIMIT, ge=1, le=USER_EVENTS_DRAIN_LIMIT),
     current_user: AccessData = Depends(get_access_data),
     notification_service: NotificationService = Depends(NotificationService.get_instance)
 ) -> list[DepositEvent | SpendEvent]:
-    all_events: list[DepositEvent | SpendEvent] = list()
-    deposit_events = await notification_service.get_user_deposit_events(current_user.wallet_address)
-    spend_events = await notification_service.get_user_spend_events(current_user.wallet_address)
-    all_events.extend(deposit_events)
-    all_events.extend(spend_events)
-    all_events.sort(key=lambda x: x.timestamp)
-    await notification_service.clear_user_events(current_user.wallet_address)
-    return all_events
+    return await notification_service.drain_user_events(current_user.wallet_address, since, limit)
+
+
+@events_router.get("/stream")
+async def stream_user_events(
+    client_id: str = Query(..., min_length=1, max_length=64),
+    last_event_id: str | None = Header(None),
+    current_user: AccessData = Depends(get_access_data),
+    notification_service: NotificationService = Depends(NotificationService.get_instance)
+) -> EventSourceResponse:
+    # validated before the stream starts, so a bad id is a 400 instead of a broken stream
+    if last_event_id is not None and not re.fullmatch(EVENT_ID_PATTERN, last_event_id):
+        raise InvalidEventIdError("Last-Event-ID must be a stream id like 1700000000000-0")
+
+    async def user_events():
+        async for event_id, event_data in notification_service.stream_user_events(
+            current_user.wallet_address, client_id, last_event_id
+        ):
+            yield {"id": event_id, "event": event_data["event_type"], "data": json.dumps(event_data["data"])}
+
+    return EventSourceResponse(user_events())
+
+
+@events_router.post("/ack")
+async def ack_user_events(
+    ack_request: EventAckRequest,
+    current_user: AccessData = Depends(get_access_data),
+    notification_service: NotificationService = Depends(NotificationService.get_instance)
+) -> JSONResponse:
+    await notification_service.ack_user_event(current_user.wallet_address, ack_request.client_id, ack_request.event_id)
+    return JSONResponse(content={"client_id": ack_request.client_id, "event_id": ack_request.event_id})
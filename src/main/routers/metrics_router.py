@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import Response
+
+from services import MetricsService
+from utils.metrics import METRICS_CONTENT_TYPE
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def get_metrics(metrics_service: MetricsService = Depends(MetricsService.get_instance)) -> Response:
+    return Response(content=await metrics_service.render(), media_type=METRICS_CONTENT_TYPE)
@@ -5,6 +5,7 @@ from fastapi.encoders import jsonable_encoder
 from dto import AccessData
 from services import UserService
 from utils.auth_utils import get_access_data
+from utils.rate_limit_utils import rate_limit
 
 user_router = APIRouter(prefix="/user")
 
@@ -16,7 +17,7 @@ async def get_profile(current_user: AccessData = Depends(get_access_data),
     return JSONResponse(content=jsonable_encoder(user, exclude_none=True))
 
 
-@user_router.get("/portfolio")
+@user_router.get("/portfolio", dependencies=[Depends(rate_limit("portfolio"))])
 async def get_portfolio(current_user: AccessData = Depends(get_access_data),
                         user_service: UserService = Depends(UserService.get_instance)) -> JSONResponse:
     user_portfolio = await user_service.get_user_profile(current_user.wallet_address)
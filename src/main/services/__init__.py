@@ -1,5 +1,11 @@
 from .auth_service import AuthService
+from .entity_cache_service import EntityCacheService
 from .user_service import UserService
+from .response_cache_service import ResponseCacheService
 from .chat_service import ChatService
 from .notification_service import NotificationService
 from .indexer_service import IndexerService
+from .chat_job_service import ChatJobService
+from .metrics_service import MetricsService
+from .rate_limit_service import RateLimitService
+from .idempotency_service import IdempotencyService
@@ -1,7 +1,10 @@
+from cachetools import TTLCache
+
 from .user_service import UserService
 from clients import EmailClient, RedisClient
-from constants import SIGN_MESSAGE
-from dto import UserEntity
+from constants import (
+    SIGN_MESSAGE, INITIAL_CHAT_CREDITS, VERIFIED_SIGNATURE_CACHE_SIZE, VERIFIED_SIGNATURE_CACHE_TTL_SECONDS
+)
 from dto import WalletAuthRequest, SendEmailCodeRequest, VerifyEmailCodeRequest, TokenResponse
 from exceptions import EmailError
 from persistence import UserDAO
@@ -9,7 +12,7 @@ from utils.helpers import generate_unique_digit_code
 from utils.jwt_utils import create_access_token, decode_jwt
 from exceptions import WalletSignatureError, InvalidCredentialsError, InvalidVerificationCodeError
 from exceptions import UserAlreadyExistsError
-from utils.wallet_utils import verify_signature, is_valid_ethereum_address
+from utils.wallet_utils import verify_signature_async, is_valid_ethereum_address
 
 
 class AuthService:
@@ -25,6 +28,9 @@ class AuthService:
             self.user_dao = user_dao
             self.email_client = email_client
             self.redis_client = redis_client
+            self._verified_signatures: TTLCache = TTLCache(
+                maxsize=VERIFIED_SIGNATURE_CACHE_SIZE, ttl=VERIFIED_SIGNATURE_CACHE_TTL_SECONDS
+            )
             self._initialized = True
 
     @classmethod
@@ -45,25 +51,12 @@ class AuthService:
         if not is_valid_ethereum_address(auth_request.wallet_address):
             raise InvalidCredentialsError("Invalid wallet address format")
 
-        if not verify_signature(
-            auth_request.wallet_address,
-            SIGN_MESSAGE,
-            auth_request.signature
-        ):
+        if not await self._verify_wallet_signature(auth_request.wallet_address, auth_request.signature):
             raise WalletSignatureError("Invalid wallet signature")
 
-        user = await self.user_dao.get_by_wallet_address(auth_request.wallet_address)
-        
-        if not user:
-            try:
-                user = await self.user_dao.create(
-                    UserEntity(
-                        wallet_address=auth_request.wallet_address,
-                        remaining_chat_credits=2.0
-                    )
-                )
-            except UserAlreadyExistsError:
-                raise UserAlreadyExistsError("User with this wallet address already exists")
+        user = await self.user_dao.get_or_create_by_wallet_address(
+            auth_request.wallet_address, INITIAL_CHAT_CREDITS
+        )
 
         access_token = create_access_token(
             user_id=user.id,
@@ -78,6 +71,16 @@ class AuthService:
             exp=payload["exp"]
         )
 
+    async def _verify_wallet_signature(self, wallet_address: str, signature: str) -> bool:
+        # SIGN_MESSAGE is fixed, so a verified (address, signature) pair stays valid; only successes are cached
+        cache_key = (wallet_address.lower(), signature.lower())
+        if cache_key in self._verified_signatures:
+            return True
+        verified = await verify_signature_async(wallet_address, SIGN_MESSAGE, signature)
+        if verified:
+            self._verified_signatures[cache_key] = True
+        return verified
+
     async def send_email_verification_code(self, email_request: SendEmailCodeRequest) -> None:
         existing_user = await self.user_dao.get_by_email(email_request.email)
         if existing_user:
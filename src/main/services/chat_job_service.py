@@ -0,0 +1,196 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+
+from .chat_service import ChatService
+from clients import RedisClient
+from constants import (
+    CHAT_JOB_STREAM, CHAT_JOB_GROUP, CHAT_JOB_MAX_QUEUE_DEPTH,
+    CHAT_JOB_MAX_PER_USER, CHAT_JOB_TTL_SECONDS, CHAT_JOB_CLAIM_IDLE_MS, CHAT_JOB_READ_BLOCK_MS
+)
+from dto import MessageEntity
+from enums import MessageRole
+from exceptions import (
+    BaseAppException, ChatJobNotFoundError, ChatLimitExceededError,
+    ChatQueueFullError, PendingUserError
+)
+
+logger = logging.getLogger(__name__)
+
+JOB_FINAL_STATUSES = ("completed", "failed")
+
+
+class ChatJobService:
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super(ChatJobService, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, chat_service: ChatService, redis_client: RedisClient):
+        if not hasattr(self, '_initialized'):
+            self.chat_service = chat_service
+            self.redis_client = redis_client
+            self.max_queue_depth = int(os.getenv("CHAT_JOB_MAX_QUEUE_DEPTH", CHAT_JOB_MAX_QUEUE_DEPTH))
+            self.max_jobs_per_user = int(os.getenv("CHAT_JOB_MAX_PER_USER", CHAT_JOB_MAX_PER_USER))
+            self._running = False
+            self._initialized = True
+
+    @classmethod
+    def initialize(cls, chat_service: ChatService, redis_client: RedisClient):
+        if cls._instance:
+            raise RuntimeError("ChatJobService is already initialized. Use get_instance() to access it.")
+        instance = cls.__new__(cls)
+        instance.__init__(chat_service=chat_service, redis_client=redis_client)
+        cls._instance = instance
+
+    @classmethod
+    def get_instance(cls) -> 'ChatJobService':
+        if cls._instance is None:
+            raise RuntimeError("ChatJobService not initialized. Call initialize() first.")
+        return cls._instance
+
+    async def enqueue_message(self, user_id: int, message_create: MessageEntity, task_name: str = None) -> dict:
+        await self.chat_service.verify_chat_ownership(message_create.chat_id, user_id)
+        job_id = uuid.uuid4().hex
+        payload = {
+            "user_id": user_id,
+            "chat_id": message_create.chat_id,
+            "content": message_create.content,
+            "task_name": task_name
+        }
+        result = await self.redis_client.enqueue_chat_job(
+            CHAT_JOB_STREAM, job_id, user_id, message_create.chat_id, payload,
+            self.max_queue_depth, self.max_jobs_per_user, CHAT_JOB_TTL_SECONDS
+        )
+        if result == -1:
+            raise ChatQueueFullError("Chat job queue is full, retry later")
+        if result == -2:
+            raise ChatLimitExceededError(f"User already has {self.max_jobs_per_user} chat jobs in progress")
+        if result == -3:
+            raise PendingUserError(f"Chat {message_create.chat_id} is already being processed")
+        return {"job_id": job_id, "status": "queued"}
+
+    async def get_job(self, job_id: str, user_id: int) -> dict:
+        job = await self.redis_client.get_chat_job(job_id)
+        return self._to_response(job_id, job, user_id)
+
+    async def get_chat_latest_job(self, chat_id: int, user_id: int) -> dict | None:
+        job_id = await self.redis_client.get_chat_latest_job(chat_id)
+        if not job_id:
+            return None
+        job = await self.redis_client.get_chat_job(job_id)
+        return self._to_response(job_id, job, user_id) if job else None
+
+    async def is_chat_busy(self, chat_id: int) -> bool:
+        if await self.chat_service.is_chat_pending(chat_id):
+            return True
+        job_id = await self.redis_client.get_chat_latest_job(chat_id)
+        if not job_id:
+            return False
+        job = await self.redis_client.get_chat_job(job_id)
+        return bool(job) and job.get("status") not in JOB_FINAL_STATUSES
+
+    async def stream_job(self, job_id: str, user_id: int, timeout: float = 90):
+        owner_checked = False
+        async for update in self.redis_client.listen_chat_job(job_id, timeout):
+            if not owner_checked:
+                response = self._to_response(job_id, update, user_id)
+                owner_checked = True
+            else:
+                response = self._to_response(job_id, update)
+            yield response
+            if response["status"] in JOB_FINAL_STATUSES:
+                return
+
+    async def run_worker(self, concurrency: int, consumer_name: str = None) -> None:
+        consumer_name = consumer_name or f"{socket.gethostname()}-{os.getpid()}"
+        await self.redis_client.ensure_consumer_group(CHAT_JOB_STREAM, CHAT_JOB_GROUP)
+        tasks: set[asyncio.Task] = set()
+        self._running = True
+        while self._running:
+            if len(tasks) >= concurrency:
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                continue
+            free_slots = concurrency - len(tasks)
+            try:
+                entries = await self.redis_client.claim_stale_chat_jobs(
+                    CHAT_JOB_STREAM, CHAT_JOB_GROUP, consumer_name, CHAT_JOB_CLAIM_IDLE_MS, free_slots
+                )
+                if not entries:
+                    entries = await self.redis_client.read_chat_jobs(
+                        CHAT_JOB_STREAM, CHAT_JOB_GROUP, consumer_name, free_slots, CHAT_JOB_READ_BLOCK_MS
+                    )
+            except Exception as e:
+                logger.error("Failed to fetch chat jobs: %s", e)
+                await asyncio.sleep(1)
+                continue
+            for entry_id, fields in entries:
+                task = asyncio.create_task(self._run_job(entry_id, fields))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop_worker(self) -> None:
+        self._running = False
+
+    async def _run_job(self, entry_id: str, fields: dict) -> None:
+        job_id = fields["job_id"]
+        payload = json.loads(fields["payload"])
+        try:
+            await self.redis_client.update_chat_job(job_id, {"status": "running"}, CHAT_JOB_TTL_SECONDS)
+            ai_message, new_balance = await self.chat_service.process_user_message(
+                payload["user_id"],
+                MessageEntity(content=payload["content"], role=MessageRole.USER, chat_id=payload["chat_id"]),
+                payload.get("task_name")
+            )
+            result = {
+                "message": {
+                    "id": ai_message.id,
+                    "content": ai_message.content,
+                    "role": ai_message.role.value,
+                    "chat_id": ai_message.chat_id,
+                    "created_at": ai_message.created_at.isoformat() if ai_message.created_at else None
+                },
+                "remaining_credits": new_balance
+            }
+            await self.redis_client.update_chat_job(
+                job_id, {"status": "completed", "result": json.dumps(result)}, CHAT_JOB_TTL_SECONDS
+            )
+        except Exception as e:
+            error = {
+                "type": type(e).__name__,
+                "detail": str(e) if isinstance(e, BaseAppException) else "Internal server error"
+            }
+            logger.error("Chat job %s failed: %s", job_id, e)
+            try:
+                await self.redis_client.update_chat_job(
+                    job_id, {"status": "failed", "error": json.dumps(error)}, CHAT_JOB_TTL_SECONDS
+                )
+            except Exception as update_error:
+                logger.error("Failed to store chat job %s failure: %s", job_id, update_error)
+        finally:
+            try:
+                await self.redis_client.finish_chat_job(CHAT_JOB_STREAM, CHAT_JOB_GROUP, entry_id, payload["user_id"])
+            except Exception as e:
+                logger.error("Failed to acknowledge chat job %s: %s", job_id, e)
+
+    @staticmethod
+    def _to_response(job_id: str, job: dict, user_id: int = None) -> dict:
+        if not job:
+            raise ChatJobNotFoundError(f"Chat job {job_id} not found")
+        if user_id is not None:
+            payload = json.loads(job.get("payload", "{}"))
+            if payload.get("user_id") != user_id:
+                raise ChatJobNotFoundError(f"Chat job {job_id} not found")
+        response = {"job_id": job_id, "status": job.get("status")}
+        if job.get("result"):
+            response["result"] = json.loads(job["result"])
+        if job.get("error"):
+            response["error"] = json.loads(job["error"])
+        return response
@@ -1,19 +1,35 @@
 import asyncio
+import logging
+import os
+import uuid
+from contextlib import asynccontextmanager
 
 from . import UserService
-from constants import PROMPT_MAP
-from dto import ChatEntity, MessageEntity
+from .response_cache_service import ResponseCacheService
+from .entity_cache_service import EntityCacheService
+from constants import (
+    PROMPT_MAP, CHAT_LEASE_TTL_SECONDS, CHAT_LEASE_RENEW_INTERVAL_SECONDS,
+    BASE_MESSAGE_COST, MESSAGE_COST_ESTIMATE, CREDIT_HOLD_TTL_SECONDS, CHAT_RESPONSE_DEADLINE_SECONDS,
+    DEFAULT_CHAT_TITLE, FALLBACK_CHAT_TITLE_WORDS, FALLBACK_CHAT_TITLE_LENGTH, NO_RESPONSE_MESSAGE
+)
+from dto import ChatEntity, MessageEntity, UserEntity
 from enums import MessageRole
 from persistence import ChatDAO, MessageDAO, UserDAO
 from clients import RedisClient
 from clients import MCPClient
 from clients import LLMClient
+from clients import UpstreamLimiter
+from clients import ToolMemory
+from utils.deadline_utils import Deadline
+from utils.metrics import span
 from exceptions import (
     ChatNotFoundError, ChatAccessDeniedError,
     InsufficientCreditsError, PendingUserError,
-    UserNotFoundError
+    UserNotFoundError, ChatLeaseLostError
 )
 
+logger = logging.getLogger(__name__)
+
 
 class ChatService:
     _instance = None
@@ -29,9 +45,9 @@ class ChatService:
             self.message_dao = message_dao
             self.user_dao = user_dao
             self.redis_client = redis_client
+            self._background_tasks: set[asyncio.Task] = set()
+            self.response_deadline = float(os.getenv("CHAT_RESPONSE_DEADLINE_SECONDS", CHAT_RESPONSE_DEADLINE_SECONDS))
             self._initialized = True
-            self.pending_chats = set()
-            self.lock = asyncio.Lock()
 
     @classmethod
     def initialize(cls, chat_dao: ChatDAO, message_dao: MessageDAO, user_dao: UserDAO, redis_client: RedisClient):
@@ -48,15 +64,15 @@ class ChatService:
         return cls._instance
 
     async def create(self, user_id: int) -> ChatEntity:
-        user = await self.user_dao.get_by_id(user_id)
+        user = await EntityCacheService.get_instance().get_user(user_id)
         if not user:
             raise UserNotFoundError(f"User not found")
         if user.remaining_chat_credits <= 0:
             raise InsufficientCreditsError(f"User has no chat credits")
-        return await self.chat_dao.create(ChatEntity(user_id=user_id, title="New Chat"))
+        return await self.chat_dao.create(ChatEntity(user_id=user_id, title=DEFAULT_CHAT_TITLE))
 
     async def get_by_id(self, chat_id: int) -> ChatEntity:
-        chat = await self.chat_dao.get_by_id(chat_id)
+        chat = await EntityCacheService.get_instance().get_chat(chat_id)
         if not chat:
             raise ChatNotFoundError(f"Chat {chat_id} not found or access denied")
         return chat
@@ -66,9 +82,11 @@ class ChatService:
 
     async def update(self, chat: ChatEntity) -> None:
         await self.chat_dao.update(chat)
+        await EntityCacheService.get_instance().invalidate_chat(chat.id)
 
     async def delete(self, chat_id: int) -> None:
         await self.chat_dao.delete(chat_id)
+        await EntityCacheService.get_instance().invalidate_chat(chat_id)
 
     async def get_chat_messages(self, chat_id: int, limit: int = 50, offset: int = 0) -> list[MessageEntity]:
         return await self.message_dao.get_chat_messages(chat_id, limit, offset)
@@ -77,66 +95,167 @@ class ChatService:
                                    user_id: int,
                                    message_create: MessageEntity,
                                    task_name: str = None) -> [MessageEntity, float]:
-        user = await self.user_dao.get_by_id(user_id)
-        if not user:
-            raise UserNotFoundError(f"User not found")
-        if user.remaining_chat_credits <= 0:
-            raise InsufficientCreditsError(f"User has no chat credits")
-        await self.verify_chat_ownership(message_create.chat_id, user_id)
-        async with self.lock:
-            if message_create.chat_id in self.pending_chats:
-                raise PendingUserError(f"Chat {message_create.chat_id} is already being processed")
-            self.pending_chats.add(message_create.chat_id)
-        try:
-            user_message = await self.message_dao.create(message_create)
-            
-            cached_messages = await self.redis_client.get_chat_messages(message_create.chat_id)
-            print(f"cached_messages: {cached_messages}")
-            if not cached_messages:
-                db_messages = await self.message_dao.get_chat_messages(message_create.chat_id, limit=20, offset=0)
-                db_messages.reverse()
-                if db_messages:
-                    for db_message in db_messages:
-                        await self.redis_client.add_chat_message(message_create.chat_id, db_message)
+        with span("chat", "process_message", chat_id=message_create.chat_id, task=task_name or ""):
+            return await self._process_user_message(user_id, message_create, task_name)
+
+    async def _process_user_message(self,
+                                    user_id: int,
+                                    message_create: MessageEntity,
+                                    task_name: str = None) -> [MessageEntity, float]:
+        deadline = Deadline(self.response_deadline)
+        with span("chat", "load_user"):
+            user = await EntityCacheService.get_instance().get_user(user_id)
+            if not user:
+                raise UserNotFoundError(f"User not found")
+            await self.verify_chat_ownership(message_create.chat_id, user_id)
+        async with (
+            self._credit_hold(user) as held_credits,
+            self._chat_lease(message_create.chat_id) as lease_token
+        ):
+            with span("chat", "persist_user_message"):
+                user_message = await self.message_dao.create(message_create)
             
-            mcp_client = MCPClient()
-            await mcp_client.setup_default_providers()
-            llm_client = LLMClient(mcp_client, message_create.chat_id, self.redis_client)
+            with span("chat", "history_warmup"):
+                cached_messages = await self.redis_client.get_chat_messages(message_create.chat_id)
+                logger.debug("Cached messages for chat %s: %s", message_create.chat_id, cached_messages)
+                db_messages = []
+                if not cached_messages:
+                    db_messages = await self.message_dao.get_chat_messages(message_create.chat_id, limit=20, offset=0)
+                    db_messages.reverse()
+                    if db_messages:
+                        for db_message in db_messages:
+                            await self.redis_client.add_chat_message(message_create.chat_id, db_message)
+                has_history = bool(cached_messages) or len(db_messages) > 1
             
-            chat = await self.chat_dao.get_by_id(message_create.chat_id)
-            if chat.title == "New Chat":
-                title = await llm_client.generate_chat_title(user_message.content)
-                await self.chat_dao.update(ChatEntity(id=message_create.chat_id, title=title))
-            prompt = PROMPT_MAP.get(task_name)
+            limiter = UpstreamLimiter(self.redis_client, f"user:{user_id}")
+            mcp_client = MCPClient(
+                cost_limit=held_credits - BASE_MESSAGE_COST,
+                limiter=limiter,
+                memory=ToolMemory(self.redis_client, message_create.chat_id)
+            )
+            llm_client = LLMClient(mcp_client, message_create.chat_id, self.redis_client, limiter)
             
-            try:
-                response = await asyncio.wait_for(
-                    llm_client.get_ai_response(message_create.content, prompt),
-                    timeout=60
-                )
-            except asyncio.TimeoutError:
-                response = "Failed to generate response"
-            ai_message = await self.message_dao.create(MessageEntity(
-                content=response,
-                role=MessageRole.AI,
-                chat_id=message_create.chat_id
-            ))
+            with span("chat", "title_fallback"):
+                chat = await EntityCacheService.get_instance().get_chat(message_create.chat_id)
+                if chat.title == DEFAULT_CHAT_TITLE:
+                    await self.update(ChatEntity(
+                        id=message_create.chat_id,
+                        title=self._fallback_chat_title(user_message.content)
+                    ))
+                    self._run_in_background(
+                        self._generate_chat_title(message_create.chat_id, user_message.content, llm_client)
+                    )
+
+            response_cache = ResponseCacheService.get_instance()
+            response = None
+            if not has_history:
+                with span("chat", "response_cache_lookup"):
+                    response = await response_cache.get(message_create.content, task_name)
+            answered = True
+            if response is None:
+                try:
+                    with span("chat", "ai_response"):
+                        response = await llm_client.get_ai_response(message_create.content, task_name, deadline)
+                    # answers built on tool fallbacks are specific to this user's turn and must not be shared
+                    cacheable = not (llm_client.partial or mcp_client.degraded or response == NO_RESPONSE_MESSAGE)
+                    if not has_history and cacheable:
+                        await response_cache.set(
+                            message_create.content, task_name, response, mcp_client.get_total_cost()
+                        )
+                except asyncio.TimeoutError:
+                    response = "Failed to generate response"
+                    answered = False
+
+            with span("chat", "persist_ai_message"):
+                await self._ensure_chat_lease(message_create.chat_id, lease_token)
+                ai_message = await self.message_dao.create(MessageEntity(
+                    content=response,
+                    role=MessageRole.AI,
+                    chat_id=message_create.chat_id
+                ))
             
-            await self.redis_client.add_chat_message(message_create.chat_id, user_message)
-            await self.redis_client.add_chat_message(message_create.chat_id, ai_message)
-            await self.redis_client.extend_chat_messages_ttl(message_create.chat_id, 300)
-            used_credit = mcp_client.get_total_cost()
-            used_credit += 0.1
-            new_balance = await UserService.get_instance().update_balance_by_id(user_id, -used_credit)
+            with span("chat", "history_update"):
+                await self.redis_client.add_chat_message(message_create.chat_id, user_message)
+                await self.redis_client.add_chat_message(message_create.chat_id, ai_message)
+                await self.redis_client.extend_chat_messages_ttl(message_create.chat_id, 300)
+            with span("chat", "balance_update"):
+                # tool spend is only billed when it made it into an answer
+                tool_cost = mcp_client.get_total_cost() if answered else 0.0
+                used_credit = min(tool_cost + BASE_MESSAGE_COST, held_credits)
+                new_balance = await UserService.get_instance().update_balance_by_id(user_id, -used_credit)
 
             return ai_message, new_balance
+
+    async def _generate_chat_title(self, chat_id: int, content: str, llm_client: LLMClient) -> None:
+        try:
+            with span("chat", "title_generation"):
+                title = await llm_client.generate_chat_title(content)
+            title = (title or "").strip().strip('"\'')
+            if title:
+                await self.update(ChatEntity(id=chat_id, title=title))
+        except Exception as e:
+            logger.warning("Failed to generate title for chat %s: %s", chat_id, e)
+
+    def _run_in_background(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    @staticmethod
+    def _fallback_chat_title(content: str) -> str:
+        title = " ".join(content.split()[:FALLBACK_CHAT_TITLE_WORDS])
+        if len(title) > FALLBACK_CHAT_TITLE_LENGTH:
+            title = title[:FALLBACK_CHAT_TITLE_LENGTH - 1].rstrip() + "…"
+        return title or DEFAULT_CHAT_TITLE
+
+    @asynccontextmanager
+    async def _credit_hold(self, user: UserEntity):
+        hold_id = uuid.uuid4().hex
+        held_credits = await self.redis_client.reserve_credits(
+            user.id, hold_id, MESSAGE_COST_ESTIMATE, BASE_MESSAGE_COST,
+            user.remaining_chat_credits, CREDIT_HOLD_TTL_SECONDS
+        )
+        if held_credits is None:
+            raise InsufficientCreditsError("User has not enough chat credits")
+        try:
+            yield held_credits
         finally:
-            async with self.lock:
-                if message_create.chat_id in self.pending_chats:
-                    self.pending_chats.remove(message_create.chat_id)
+            try:
+                await self.redis_client.release_credits(user.id, hold_id)
+            except Exception as e:
+                logger.error("Failed to release credit hold for user %s: %s", user.id, e)
+
+    @asynccontextmanager
+    async def _chat_lease(self, chat_id: int):
+        lease_name = f"chat:{chat_id}"
+        lease_token = await self.redis_client.acquire_lease(lease_name, CHAT_LEASE_TTL_SECONDS * 1000)
+        if lease_token is None:
+            raise PendingUserError(f"Chat {chat_id} is already being processed")
+        keepalive = asyncio.create_task(self._keep_chat_lease_alive(lease_name, lease_token))
+        try:
+            yield lease_token
+        finally:
+            keepalive.cancel()
+            try:
+                await self.redis_client.release_lease(lease_name, lease_token)
+            except Exception as e:
+                logger.error("Failed to release lease for chat %s: %s", chat_id, e)
+
+    async def _keep_chat_lease_alive(self, lease_name: str, lease_token: int) -> None:
+        while True:
+            await asyncio.sleep(CHAT_LEASE_RENEW_INTERVAL_SECONDS)
+            try:
+                if not await self.redis_client.renew_lease(lease_name, lease_token, CHAT_LEASE_TTL_SECONDS * 1000):
+                    return
+            except Exception as e:
+                logger.error("Failed to renew lease %s: %s", lease_name, e)
+
+    async def _ensure_chat_lease(self, chat_id: int, lease_token: int) -> None:
+        if not await self.redis_client.check_lease(f"chat:{chat_id}", lease_token):
+            raise ChatLeaseLostError(f"Chat {chat_id} processing lease expired, response discarded")
 
     async def verify_chat_ownership(self, chat_id: int, user_id: int) -> None:
-        chat = await self.chat_dao.get_by_id(chat_id)
+        chat = await EntityCacheService.get_instance().get_chat(chat_id)
         if not chat:
             raise ChatNotFoundError(f"Chat {chat_id} not found")
         if chat.user_id != user_id:
@@ -147,5 +266,4 @@ class ChatService:
         return list(PROMPT_MAP.keys())
     
     async def is_chat_pending(self, chat_id: int) -> bool:
-        async with self.lock:
-            return chat_id in self.pending_chats
+        return await self.redis_client.is_lease_held(f"chat:{chat_id}")
@@ -0,0 +1,148 @@
+import asyncio
+import dataclasses
+import logging
+import os
+from datetime import datetime
+
+from cachetools import TTLCache
+
+from clients import RedisClient
+from constants import (
+    ENTITY_CACHE_L1_SIZE, ENTITY_CACHE_L1_TTL_SECONDS, ENTITY_CACHE_L2_TTL_SECONDS, ENTITY_CACHE_CHANNEL
+)
+from dto import ChatEntity, UserEntity
+from persistence import ChatDAO, UserDAO
+from utils.metrics import observe_entity_cache
+
+logger = logging.getLogger(__name__)
+
+
+class EntityCacheService:
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super(EntityCacheService, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, user_dao: UserDAO, chat_dao: ChatDAO, redis_client: RedisClient):
+        if not hasattr(self, '_initialized'):
+            self.user_dao = user_dao
+            self.chat_dao = chat_dao
+            self.redis_client = redis_client
+            self.l2_ttl = int(os.getenv("ENTITY_CACHE_L2_TTL_SECONDS", ENTITY_CACHE_L2_TTL_SECONDS))
+            self._local = TTLCache(
+                maxsize=int(os.getenv("ENTITY_CACHE_L1_SIZE", ENTITY_CACHE_L1_SIZE)),
+                ttl=float(os.getenv("ENTITY_CACHE_L1_TTL_SECONDS", ENTITY_CACHE_L1_TTL_SECONDS))
+            )
+            # bumped on every invalidation; a load that raced one is not stored in L1
+            self._generation = 0
+            self._listener: asyncio.Task | None = None
+            self._initialized = True
+
+    @classmethod
+    def initialize(cls, user_dao: UserDAO, chat_dao: ChatDAO, redis_client: RedisClient):
+        if cls._instance:
+            raise RuntimeError("EntityCacheService is already initialized. Use get_instance() to access it.")
+        instance = cls.__new__(cls)
+        instance.__init__(user_dao=user_dao, chat_dao=chat_dao, redis_client=redis_client)
+        cls._instance = instance
+
+    @classmethod
+    def get_instance(cls) -> 'EntityCacheService':
+        if cls._instance is None:
+            raise RuntimeError("EntityCacheService not initialized. Call initialize() first.")
+        return cls._instance
+
+    async def get_user(self, user_id: int) -> UserEntity | None:
+        return await self._get(f"user:{user_id}", UserEntity, lambda: self.user_dao.get_by_id(user_id))
+
+    async def get_chat(self, chat_id: int) -> ChatEntity | None:
+        return await self._get(f"chat:{chat_id}", ChatEntity, lambda: self.chat_dao.get_by_id(chat_id))
+
+    async def invalidate_user(self, user_id: int) -> None:
+        await self._invalidate(f"user:{user_id}")
+
+    async def invalidate_chat(self, chat_id: int) -> None:
+        await self._invalidate(f"chat:{chat_id}")
+
+    def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen_invalidations())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _get(self, key: str, entity_type: type, load):
+        entity_name = key.split(":", 1)[0]
+        entity = self._local.get(key)
+        if entity is not None:
+            observe_entity_cache(entity_name, "l1")
+            return dataclasses.replace(entity)
+
+        generation = self._generation
+        try:
+            cached, version = await self.redis_client.get_cached_entity(key)
+        except Exception as e:
+            logger.warning("Entity cache read failed for %s: %s", key, e)
+            return await load()
+
+        if cached is not None:
+            observe_entity_cache(entity_name, "l2")
+            entity = self._decode(entity_type, cached)
+        else:
+            observe_entity_cache(entity_name, "db")
+            entity = await load()
+            if entity is None:
+                return None
+            try:
+                await self.redis_client.set_cached_entity(key, self._encode(entity), version, self.l2_ttl)
+            except Exception as e:
+                logger.warning("Entity cache write failed for %s: %s", key, e)
+
+        if generation == self._generation:
+            self._local[key] = entity
+        return dataclasses.replace(entity)
+
+    async def _invalidate(self, key: str) -> None:
+        self._drop(key)
+        try:
+            await self.redis_client.invalidate_cached_entity(key, ENTITY_CACHE_CHANNEL, self.l2_ttl)
+        except Exception as e:
+            logger.error("Entity cache invalidation failed for %s: %s", key, e)
+
+    def _drop(self, key: str) -> None:
+        self._generation += 1
+        self._local.pop(key, None)
+
+    async def _listen_invalidations(self) -> None:
+        while True:
+            # anything published while we were not subscribed is lost, so start every subscription from an empty L1
+            self._generation += 1
+            self._local.clear()
+            try:
+                async for key in self.redis_client.listen_entity_invalidations(ENTITY_CACHE_CHANNEL):
+                    self._drop(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Entity cache invalidation listener failed: %s", e)
+                await asyncio.sleep(1)
+
+    @staticmethod
+    def _encode(entity) -> dict:
+        return {
+            name: value.isoformat() if isinstance(value, datetime) else value
+            for name, value in dataclasses.asdict(entity).items()
+        }
+
+    @staticmethod
+    def _decode(entity_type: type, data: dict):
+        created_at = data.get("created_at")
+        return entity_type(**{**data, "created_at": datetime.fromisoformat(created_at) if created_at else None})
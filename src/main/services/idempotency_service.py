@@ -0,0 +1,97 @@
+import hashlib
+import json
+import logging
+import os
+import uuid
+from contextlib import aclosing
+from typing import Awaitable, Callable
+
+from clients import RedisClient
+from constants import (
+    IDEMPOTENCY_KEY_MAX_LENGTH, IDEMPOTENCY_IN_FLIGHT_TTL_SECONDS, IDEMPOTENCY_RESPONSE_TTL_SECONDS,
+    IDEMPOTENCY_WAIT_SECONDS
+)
+from exceptions import InvalidIdempotencyKeyError, IdempotencyKeyReusedError, IdempotencyKeyInProgressError
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyService:
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super(IdempotencyService, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, redis_client: RedisClient):
+        if not hasattr(self, '_initialized'):
+            self.redis_client = redis_client
+            self.wait_seconds = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", IDEMPOTENCY_WAIT_SECONDS))
+            self._initialized = True
+
+    @classmethod
+    def initialize(cls, redis_client: RedisClient):
+        if cls._instance:
+            raise RuntimeError("IdempotencyService is already initialized. Use get_instance() to access it.")
+        instance = cls.__new__(cls)
+        instance.__init__(redis_client=redis_client)
+        cls._instance = instance
+
+    @classmethod
+    def get_instance(cls) -> 'IdempotencyService':
+        if cls._instance is None:
+            raise RuntimeError("IdempotencyService not initialized. Call initialize() first.")
+        return cls._instance
+
+    async def execute(self, user_id: int, idempotency_key: str | None, request_data: dict,
+                      handler: Callable[[], Awaitable[tuple[int, dict]]]) -> tuple[int, dict, bool]:
+        # returns (status code, content, replayed)
+        if idempotency_key is None:
+            status_code, content = await handler()
+            return status_code, content, False
+        if not idempotency_key or len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise InvalidIdempotencyKeyError(f"Idempotency-Key must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters")
+
+        key = f"{user_id}:{idempotency_key}"
+        fingerprint = hashlib.sha256(json.dumps(request_data, sort_keys=True).encode()).hexdigest()
+        while True:
+            owner = uuid.uuid4().hex
+            record = await self.redis_client.claim_idempotency_key(
+                key, fingerprint, owner, IDEMPOTENCY_IN_FLIGHT_TTL_SECONDS
+            )
+            if record is None:
+                return await self._run(key, owner, handler)
+            if record.get("fingerprint") != fingerprint:
+                raise IdempotencyKeyReusedError("Idempotency-Key was already used for a different request")
+            response = await self._wait_for_response(key)
+            if response is not None:
+                return response["status_code"], response["content"], True
+            # the original request failed and gave the key back, so this retry runs it
+
+    async def _run(self, key: str, owner: str, handler: Callable[[], Awaitable[tuple[int, dict]]]) -> tuple[int, dict, bool]:
+        try:
+            status_code, content = await handler()
+        except BaseException:
+            # failed requests are not replayed: a retry with the same key runs again
+            try:
+                await self.redis_client.release_idempotency_key(key, owner)
+            except Exception as e:
+                logger.error("Failed to release idempotency key %s: %s", key, e)
+            raise
+        try:
+            await self.redis_client.complete_idempotency_key(
+                key, owner, {"status_code": status_code, "content": content}, IDEMPOTENCY_RESPONSE_TTL_SECONDS
+            )
+        except Exception as e:
+            logger.error("Failed to store response for idempotency key %s: %s", key, e)
+        return status_code, content, False
+
+    async def _wait_for_response(self, key: str) -> dict | None:
+        async with aclosing(self.redis_client.listen_idempotency_key(key, self.wait_seconds)) as records:
+            async for record in records:
+                if not record:
+                    return None
+                if record.get("status") == "completed":
+                    return json.loads(record["response"])
+        raise IdempotencyKeyInProgressError("A request with this Idempotency-Key is still being processed")
@@ -3,6 +3,7 @@ import time
 import logging
 from clients import IndexerClient
 from clients import RedisClient
+from constants import INDEXER_LEADER_LEASE
 from dto import IndexerConverter
 from dto import GraphQLResponse, CreditsDeposited, CreditsDepositedETH, CreditsUsed
 from services import NotificationService
@@ -26,6 +27,7 @@ class IndexerService:
             self.redis_client = redis_client
             self._initialized = True
             self._running = False
+            self._leader_token: int | None = None
             self.last_timestamp = time.time()
             self.recent_event_ttl = 10
     
@@ -49,13 +51,36 @@ class IndexerService:
         
         self._running = True
         while self._running:
-            self.last_timestamp = time.time() - interval_seconds * 2
-            await self._process_indexer_data()
+            if await self._hold_leadership(interval_seconds * 3):
+                self.last_timestamp = time.time() - interval_seconds * 2
+                await self._process_indexer_data()
             await asyncio.sleep(interval_seconds)
             self.recent_event_ttl = interval_seconds * 3
 
     async def stop_periodic_queries(self):
         self._running = False
+        if self._leader_token is not None:
+            try:
+                await self.redis_client.release_lease(INDEXER_LEADER_LEASE, self._leader_token)
+            except Exception as e:
+                logger.error(f"Error releasing indexer leadership: {e}")
+            self._leader_token = None
+
+    async def _hold_leadership(self, lease_seconds: int) -> bool:
+        try:
+            if self._leader_token is not None:
+                if await self.redis_client.renew_lease(INDEXER_LEADER_LEASE, self._leader_token, lease_seconds * 1000):
+                    return True
+                logger.warning("Indexer leadership lost")
+                self._leader_token = None
+            self._leader_token = await self.redis_client.acquire_lease(INDEXER_LEADER_LEASE, lease_seconds * 1000)
+            if self._leader_token is not None:
+                logger.info(f"Indexer leadership acquired with token {self._leader_token}")
+            return self._leader_token is not None
+        except Exception as e:
+            logger.error(f"Error acquiring indexer leadership: {e}")
+            self._leader_token = None
+            return False
     
     async def _process_indexer_data(self):
         try:
@@ -0,0 +1,47 @@
+import logging
+
+from clients import RedisClient
+from constants import METRICS_STATS_NAMES
+from utils.metrics import render_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsService:
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super(MetricsService, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, redis_client: RedisClient):
+        if not hasattr(self, '_initialized'):
+            self.redis_client = redis_client
+            self._initialized = True
+
+    @classmethod
+    def initialize(cls, redis_client: RedisClient):
+        if cls._instance:
+            raise RuntimeError("MetricsService is already initialized. Use get_instance() to access it.")
+        instance = cls.__new__(cls)
+        instance.__init__(redis_client=redis_client)
+        cls._instance = instance
+
+    @classmethod
+    def get_instance(cls) -> 'MetricsService':
+        if cls._instance is None:
+            raise RuntimeError("MetricsService not initialized. Call initialize() first.")
+        return cls._instance
+
+    async def render(self) -> bytes:
+        stats = {}
+        for name in METRICS_STATS_NAMES:
+            try:
+                stats[name] = await self.redis_client.get_stats(name)
+                lookups = stats[name].get("hits", 0.0) + stats[name].get("misses", 0.0)
+                if lookups:
+                    stats[name]["hit_ratio"] = stats[name].get("hits", 0.0) / lookups
+            except Exception as e:
+                logger.error("Failed to read %s stats: %s", name, e)
+        return render_metrics(stats)
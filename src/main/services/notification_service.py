@@ -1,5 +1,9 @@
 from dto import DepositEvent, SpendEvent
 from clients import RedisClient
+from constants import (
+    EVENT_STREAM_MAXLEN, EVENT_STREAM_TTL_SECONDS, EVENT_STREAM_READ_COUNT,
+    EVENT_STREAM_BLOCK_MS, EVENT_ACK_TTL_SECONDS, USER_EVENTS_MAX, USER_EVENTS_TTL_SECONDS
+)
 from exceptions import RedisOperationError
 
 
@@ -37,8 +41,10 @@ class NotificationService:
                 "data": deposit_event.dict(),
                 "timestamp": deposit_event.timestamp
             }
-            await self.redis_client.store_user_event(deposit_event.user, event_data)
-            events_data = await self.redis_client.get_user_deposit_events(deposit_event.user)
+            await self.redis_client.store_user_event(
+                deposit_event.user, event_data, USER_EVENTS_MAX, USER_EVENTS_TTL_SECONDS
+            )
+            await self._publish_user_event(deposit_event.user, event_data)
         except Exception as e:
             raise RedisOperationError(f"Failed to store deposit event: {str(e)}")
     
@@ -50,25 +56,39 @@ class NotificationService:
                 "timestamp": spend_event.timestamp
             }
             
-            await self.redis_client.store_user_event(spend_event.user, event_data)
+            await self.redis_client.store_user_event(
+                spend_event.user, event_data, USER_EVENTS_MAX, USER_EVENTS_TTL_SECONDS
+            )
+            await self._publish_user_event(spend_event.user, event_data)
         except Exception as e:
             raise RedisOperationError(f"Failed to store spend event: {str(e)}")
+
+    async def _publish_user_event(self, user_wallet: str, event_data: dict) -> str:
+        return await self.redis_client.append_user_event(
+            user_wallet, event_data, EVENT_STREAM_MAXLEN, EVENT_STREAM_TTL_SECONDS
+        )
+
+    async def stream_user_events(self, user_wallet: str, client_id: str, last_event_id: str = None):
+        # resume after Last-Event-ID, else after this client's last ack, else replay the whole buffer
+        cursor = last_event_id or await self.redis_client.get_user_event_ack(user_wallet, client_id) or "0-0"
+        while True:
+            events = await self.redis_client.read_user_events(
+                user_wallet, cursor, EVENT_STREAM_READ_COUNT, EVENT_STREAM_BLOCK_MS
+            )
+            for event_id, event_data in events:
+                cursor = event_id
+                yield event_id, event_data
+
+    async def ack_user_event(self, user_wallet: str, client_id: str, event_id: str) -> None:
+        await self.redis_client.set_user_event_ack(user_wallet, client_id, event_id, EVENT_ACK_TTL_SECONDS)
     
-    async def get_user_deposit_events(self, user_wallet: str) -> list[DepositEvent]:
-        try:
-            return await self.redis_client.get_user_deposit_events(user_wallet)
-        except Exception as e:
-            raise RedisOperationError(f"Failed to get user deposit events: {str(e)}")
-    
-    async def get_user_spend_events(self, user_wallet: str) -> list[SpendEvent]:
-        try:
-            return await self.redis_client.get_user_spend_events(user_wallet)
-        except Exception as e:
-            raise RedisOperationError(f"Failed to get user spend events: {str(e)}")
-    
-    async def clear_user_events(self, user_wallet: str) -> None:
+    async def drain_user_events(self, user_wallet: str, since: float | None,
+                                limit: int) -> list[DepositEvent | SpendEvent]:
         try:
-            await self.redis_client.clear_user_events(user_wallet)
+            events = await self.redis_client.drain_user_events(user_wallet, since, limit)
+            return [
+                DepositEvent(**event["data"]) if event["event_type"] == "deposit" else SpendEvent(**event["data"])
+                for event in events
+            ]
         except Exception as e:
-            raise RedisOperationError(f"Failed to clear user events: {str(e)}")
-    
+            raise RedisOperationError(f"Failed to drain user events: {str(e)}")
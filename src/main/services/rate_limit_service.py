@@ -0,0 +1,60 @@
+import logging
+import math
+import os
+
+from clients import RedisClient
+from constants import RATE_LIMIT_POLICIES
+from dto import RateLimitResult
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitService:
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super(RateLimitService, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, redis_client: RedisClient):
+        if not hasattr(self, '_initialized'):
+            self.redis_client = redis_client
+            self.enabled = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+            self._initialized = True
+
+    @classmethod
+    def initialize(cls, redis_client: RedisClient):
+        if cls._instance:
+            raise RuntimeError("RateLimitService is already initialized. Use get_instance() to access it.")
+        instance = cls.__new__(cls)
+        instance.__init__(redis_client=redis_client)
+        cls._instance = instance
+
+    @classmethod
+    def get_instance(cls) -> 'RateLimitService':
+        if cls._instance is None:
+            raise RuntimeError("RateLimitService not initialized. Call initialize() first.")
+        return cls._instance
+
+    async def check(self, identity: str, policy_names: tuple[str, ...]) -> RateLimitResult | None:
+        if not self.enabled:
+            return None
+        policies = [RATE_LIMIT_POLICIES[name] for name in policy_names]
+        try:
+            allowed, tightest, remaining, reset_ms, retry_ms = await self.redis_client.consume_rate_limit(
+                [f"rate_limit:{identity}:{name}" for name in policy_names],
+                [(capacity, capacity / (window * 1000)) for capacity, window in policies]
+            )
+        except Exception as e:
+            # a Redis outage should not take the API down with it
+            logger.warning("Rate limit check failed for %s, allowing request: %s", identity, e)
+            return None
+        return RateLimitResult(
+            allowed=allowed,
+            limit=policies[tightest][0],
+            remaining=remaining,
+            reset_seconds=math.ceil(reset_ms / 1000),
+            retry_after_seconds=math.ceil(retry_ms / 1000),
+            policy=", ".join(f"{capacity};w={window}" for capacity, window in policies)
+        )
@@ -0,0 +1,148 @@
+import hashlib
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+
+from clients import RedisClient
+from constants import (
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD, RESPONSE_CACHE_INDEX_SIZE, RESPONSE_CACHE_TTL_SECONDS,
+    RESPONSE_CACHE_REALTIME_KEYWORDS, RESPONSE_CACHE_SOCIAL_KEYWORDS
+)
+
+logger = logging.getLogger(__name__)
+
+_ENTITY_PATTERN = re.compile(r"@\w+|0x[0-9a-f]+|\d+(?:\.\d+)?")
+_NOISE_PATTERN = re.compile(r"[^\w@.\s-]")
+_STOP_WORDS = frozenset((
+    "what", "whats", "is", "the", "a", "an", "of", "for", "on", "in", "to", "me", "please",
+    "can", "you", "tell", "show", "give", "about", "how", "much", "does", "do", "and", "s",
+))
+# generic query wording: left to the n-gram score, so only names, handles, addresses and numbers must agree
+_QUERY_WORDS = frozenset((
+    *RESPONSE_CACHE_REALTIME_KEYWORDS, *RESPONSE_CACHE_SOCIAL_KEYWORDS,
+    "collection", "nft", "nfts", "stats", "info", "profile", "wallet", "owners", "many", "who", "which",
+    "right", "are", "count", "number", "its", "it", "this", "that", "with", "by", "from", "at", "my", "i", "check", "get", "find",
+))
+
+
+class ResponseCacheService:
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super(ResponseCacheService, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, redis_client: RedisClient):
+        if not hasattr(self, '_initialized'):
+            self.redis_client = redis_client
+            self.enabled = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+            self.similarity_threshold = float(
+                os.getenv("RESPONSE_CACHE_SIMILARITY_THRESHOLD", RESPONSE_CACHE_SIMILARITY_THRESHOLD)
+            )
+            self._similarity_index: OrderedDict[str, tuple[str, frozenset, frozenset, float]] = OrderedDict()
+            self._initialized = True
+
+    @classmethod
+    def initialize(cls, redis_client: RedisClient):
+        if cls._instance:
+            raise RuntimeError("ResponseCacheService is already initialized. Use get_instance() to access it.")
+        instance = cls.__new__(cls)
+        instance.__init__(redis_client=redis_client)
+        cls._instance = instance
+
+    @classmethod
+    def get_instance(cls) -> 'ResponseCacheService':
+        if cls._instance is None:
+            raise RuntimeError("ResponseCacheService not initialized. Call initialize() first.")
+        return cls._instance
+
+    async def get(self, prompt: str, task_name: str = None) -> str | None:
+        if not self.enabled:
+            return None
+        normalized = self._normalize(prompt)
+        cache_key = self._cache_key(normalized, task_name)
+        try:
+            cached = await self.redis_client.get_cached_response(cache_key)
+            if cached is None and self.similarity_threshold > 0:
+                similar_key = self._find_similar(normalized, task_name)
+                if similar_key:
+                    cached = await self.redis_client.get_cached_response(similar_key)
+            if cached is None:
+                await self.redis_client.increment_stats("response_cache", {"misses": 1})
+                return None
+            await self.redis_client.increment_stats(
+                "response_cache", {"hits": 1, "saved_cost": float(cached.get("cost", 0.0))}
+            )
+            return cached["content"]
+        except Exception as e:
+            logger.error("Response cache lookup failed: %s", e)
+            return None
+
+    async def set(self, prompt: str, task_name: str, content: str, cost: float) -> None:
+        if not self.enabled:
+            return
+        normalized = self._normalize(prompt)
+        cache_key = self._cache_key(normalized, task_name)
+        ttl = self._ttl(normalized)
+        try:
+            await self.redis_client.set_cached_response(cache_key, {"content": content, "cost": cost}, ttl)
+        except Exception as e:
+            logger.error("Response cache store failed: %s", e)
+            return
+        self._similarity_index[cache_key] = (
+            task_name or "", self._shingles(normalized), self._entities(normalized), time.time() + ttl
+        )
+        self._similarity_index.move_to_end(cache_key)
+        while len(self._similarity_index) > RESPONSE_CACHE_INDEX_SIZE:
+            self._similarity_index.popitem(last=False)
+
+    def _find_similar(self, normalized: str, task_name: str | None) -> str | None:
+        shingles = self._shingles(normalized)
+        entities = self._entities(normalized)
+        now = time.time()
+        best_key, best_score = None, self.similarity_threshold
+        for cache_key, (entry_task, entry_shingles, entry_entities, expires_at) in list(self._similarity_index.items()):
+            if expires_at <= now:
+                del self._similarity_index[cache_key]
+                continue
+            if entry_task != (task_name or "") or entry_entities != entities:
+                continue
+            union = len(shingles | entry_shingles)
+            score = len(shingles & entry_shingles) / union if union else 0.0
+            if score >= best_score:
+                best_key, best_score = cache_key, score
+        return best_key
+
+    def _cache_key(self, normalized: str, task_name: str | None) -> str:
+        ttl = self._ttl(normalized)
+        freshness_window = int(time.time() // ttl)
+        digest = hashlib.sha256(normalized.encode()).hexdigest()
+        return f"{task_name or 'default'}:{ttl}:{freshness_window}:{digest}"
+
+    @staticmethod
+    def _ttl(normalized: str) -> int:
+        words = set(normalized.split())
+        if words.intersection(RESPONSE_CACHE_REALTIME_KEYWORDS):
+            return RESPONSE_CACHE_TTL_SECONDS["realtime"]
+        if "@" in normalized or words.intersection(RESPONSE_CACHE_SOCIAL_KEYWORDS):
+            return RESPONSE_CACHE_TTL_SECONDS["social"]
+        return RESPONSE_CACHE_TTL_SECONDS["static"]
+
+    @staticmethod
+    def _normalize(prompt: str) -> str:
+        words = (word.strip(".-") for word in _NOISE_PATTERN.sub(" ", prompt.lower()).split())
+        return " ".join(word for word in words if word)
+
+    @staticmethod
+    def _shingles(normalized: str, size: int = 3) -> frozenset:
+        # stop words are filler; word order and the remaining wording are what the score compares
+        text = " ".join(word for word in normalized.split() if word not in _STOP_WORDS)
+        return frozenset(text[i:i + size] for i in range(max(1, len(text) - size + 1)))
+
+    @staticmethod
+    def _entities(normalized: str) -> frozenset:
+        names = {word for word in normalized.split() if word not in _STOP_WORDS and word not in _QUERY_WORDS}
+        return frozenset(_ENTITY_PATTERN.findall(normalized)) | names
@@ -4,6 +4,7 @@ from dto import UserEntity, UserProfile
 from persistence import UserDAO
 from exceptions import UserNotFoundError, UserEmailAlreadyExistsError, MCPResponseError
 from clients import MCPClient
+from .entity_cache_service import EntityCacheService
 from utils.portfolio_utils import json_to_user_profile
 
 
@@ -35,7 +36,7 @@ class UserService:
         return cls._instance
 
     async def get_user_by_id(self, user_id: int) -> UserEntity:
-        user = await self.user_dao.get_by_id(user_id)
+        user = await EntityCacheService.get_instance().get_user(user_id)
         if not user:
             raise UserNotFoundError(f"User with id {user_id} not found")
         return user
@@ -54,26 +55,22 @@ class UserService:
             raise UserEmailAlreadyExistsError("User already has set email")
         user.email = email
         await self.user_dao.update(user)
+        await EntityCacheService.get_instance().invalidate_user(user_id)
 
     async def update_balance_by_id(self, user_id: int, delta: float) -> float:
-        user = await self.user_dao.get_by_id(user_id)
-        if not user:
+        new_balance = await self.user_dao.add_balance_by_id(user_id, delta)
+        if new_balance is None:
             raise UserNotFoundError(f"User with id {user_id} not found")
-        if delta == 0:
-            return user.remaining_chat_credits
-        user.remaining_chat_credits += delta
-        await self.user_dao.update(user)
-        return user.remaining_chat_credits
+        await EntityCacheService.get_instance().invalidate_user(user_id)
+        return new_balance
 
     async def update_balance_by_wallet(self, wallet_address: str, delta: float) -> float:
-        user = await self.user_dao.get_by_wallet_address(wallet_address)
-        if not user:
+        result = await self.user_dao.add_balance_by_wallet_address(wallet_address, delta)
+        if result is None:
             raise UserNotFoundError(f"User with wallet {wallet_address} not found")
-        if delta == 0:
-            return user.remaining_chat_credits
-        user.remaining_chat_credits += delta
-        await self.user_dao.update(user)
-        return user.remaining_chat_credits
+        user_id, new_balance = result
+        await EntityCacheService.get_instance().invalidate_user(user_id)
+        return new_balance
 
     @staticmethod
     async def get_user_profile(wallet_address: str) -> UserProfile:
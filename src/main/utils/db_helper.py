@@ -1,19 +1,30 @@
 import os
+from pathlib import Path
+
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy import text
 
 from domain import Base
+from exceptions import SchemaVersionMismatchError
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+
+def get_database_url() -> str:
+    return (
+        f"postgresql+asyncpg://"
+        f"{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}"
+        f"@{os.getenv('POSTGRES_HOST', 'localhost')}:{os.getenv('POSTGRES_PORT', 5432)}"
+        f"/{os.getenv('POSTGRES_DB')}"
+    )
 
 
 class DatabaseHelper:
 
     def __init__(self, db_url: str | None = None):
-        database_url = db_url or (
-            f"postgresql+asyncpg://"
-            f"{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}"
-            f"@{os.getenv('POSTGRES_HOST', 'localhost')}:{os.getenv('POSTGRES_PORT', 5432)}"
-            f"/{os.getenv('POSTGRES_DB')}"
-        )
+        database_url = db_url or get_database_url()
         self._engine = create_async_engine(
             database_url,
             echo=False,
@@ -38,6 +49,18 @@ class DatabaseHelper:
         async with self._engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
 
+    async def check_schema_version(self) -> None:
+        head_revision = ScriptDirectory(str(MIGRATIONS_DIR)).get_current_head()
+        async with self._engine.connect() as conn:
+            current_revision = await conn.run_sync(
+                lambda sync_conn: MigrationContext.configure(sync_conn).get_current_revision()
+            )
+        if current_revision != head_revision:
+            raise SchemaVersionMismatchError(
+                f"Database schema is at revision {current_revision}, expected {head_revision}. "
+                f"Run `alembic upgrade head` before starting the app"
+            )
+
     async def del_schema(self):
         async with self._engine.begin() as conn:
             # Удаляем таблицы с CASCADE для обработки зависимостей
@@ -4,6 +4,7 @@ from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from exceptions import *
+from utils.rate_limit_utils import rate_limit_headers
 
 
 async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
@@ -25,13 +26,38 @@ async def global_exception_handler(request: Request, exc: Exception) -> JSONResp
             content={"detail": "Validation error", "errors": exc.errors(), "type": "validation_error"}
         )
     
-    if isinstance(exc, (UserNotFoundError, ChatNotFoundError, MessageNotFoundError)):
+    if isinstance(exc, (UserNotFoundError, ChatNotFoundError, MessageNotFoundError, ChatJobNotFoundError)):
         return JSONResponse(
             status_code=404,
             content={"detail": str(exc), "type": "not_found_error"}
         )
     
-    if isinstance(exc, (UserAlreadyExistsError, UserEmailAlreadyExistsError)):
+    if isinstance(exc, IdempotencyKeyInProgressError):
+        return JSONResponse(
+            status_code=409,
+            content={"detail": str(exc), "type": "conflict_error"},
+            headers={"Retry-After": "5"}
+        )
+
+    if isinstance(exc, IdempotencyKeyReusedError):
+        return JSONResponse(
+            status_code=422,
+            content={"detail": str(exc), "type": "idempotency_error"}
+        )
+
+    if isinstance(exc, InvalidEventIdError):
+        return JSONResponse(
+            status_code=400,
+            content={"detail": str(exc), "type": "event_error"}
+        )
+
+    if isinstance(exc, InvalidIdempotencyKeyError):
+        return JSONResponse(
+            status_code=400,
+            content={"detail": str(exc), "type": "idempotency_error"}
+        )
+
+    if isinstance(exc, (UserAlreadyExistsError, UserEmailAlreadyExistsError, ChatLeaseLostError)):
         return JSONResponse(
             status_code=409,
             content={"detail": str(exc), "type": "conflict_error"}
@@ -69,12 +95,39 @@ async def global_exception_handler(request: Request, exc: Exception) -> JSONResp
         return response
         
     
+    if isinstance(exc, RateLimitExceededError):
+        rate_limit = getattr(request.state, "rate_limit", None)
+        response = JSONResponse(
+            status_code=429,
+            content={"detail": str(exc), "type": "rate_limit_error"},
+            headers=rate_limit_headers(rate_limit) if rate_limit else None
+        )
+        response.headers["Access-Control-Allow-Origin"] = "*"
+        response.headers["Access-Control-Allow-Credentials"] = "true"
+        response.headers["Access-Control-Allow-Methods"] = "*"
+        response.headers["Access-Control-Allow-Headers"] = "*"
+        return response
+
+    if isinstance(exc, UpstreamRateLimitError):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(exc), "type": "upstream_busy_error"},
+            headers={"Retry-After": "10"}
+        )
+
     if isinstance(exc, (ChatLimitExceededError, PendingUserError)):
         return JSONResponse(
             status_code=429,
             content={"detail": str(exc), "type": "rate_limit_error"}
         )
     
+    if isinstance(exc, ChatQueueFullError):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": str(exc), "type": "queue_full_error"},
+            headers={"Retry-After": "5"}
+        )
+
     if isinstance(exc, (
             RedisConnectionError, RedisOperationError,
             IndexerConnectionError, IndexerQueryError)):
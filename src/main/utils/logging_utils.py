@@ -0,0 +1,87 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+
+from constants import LOG_MAX_MESSAGE_LENGTH, LOG_DEBUG_SAMPLE_RATE
+
+_listener: QueueListener | None = None
+
+
+class DebugSamplingFilter(logging.Filter):
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or random.random() < self.sample_rate
+
+
+class TruncatingQueueHandler(QueueHandler):
+    # Only the message is rendered on the event loop; formatting and the stdout write happen in the listener thread
+    def __init__(self, log_queue: queue.Queue, max_length: int):
+        super().__init__(log_queue)
+        self.max_length = max_length
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = record.getMessage()
+        if len(message) > self.max_length:
+            message = f"{message[:self.max_length]}… [{len(message) - self.max_length} chars truncated]"
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging() -> None:
+    global _listener
+    if _listener is not None:
+        return
+    level = os.getenv("LOG_LEVEL", "INFO").upper()
+    max_length = int(os.getenv("LOG_MAX_MESSAGE_LENGTH", LOG_MAX_MESSAGE_LENGTH))
+    sample_rate = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", LOG_DEBUG_SAMPLE_RATE))
+
+    stream_handler = logging.StreamHandler()
+    if os.getenv("LOG_FORMAT", "json").lower() == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = TruncatingQueueHandler(log_queue, max_length)
+    queue_handler.addFilter(DebugSamplingFilter(sample_rate))
+
+    root_logger = logging.getLogger()
+    root_logger.handlers = [queue_handler]
+    root_logger.setLevel(level)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
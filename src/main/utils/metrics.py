@@ -0,0 +1,120 @@
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from prometheus_client.core import GaugeMetricFamily
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+STAGE_DURATION = Histogram(
+    "basedagent_stage_duration_seconds",
+    "Duration of message processing stages",
+    ["component", "stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+)
+TOOL_DURATION = Histogram(
+    "basedagent_tool_duration_seconds",
+    "Duration of MCP tool calls",
+    ["tool", "status"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30)
+)
+TOOL_COST = Counter("basedagent_tool_cost_usd", "Credits charged for MCP tool calls", ["tool"])
+LLM_TOKENS = Counter("basedagent_llm_tokens", "Tokens used by LLM requests", ["purpose", "kind"])
+UPSTREAM_RETRIES = Counter("basedagent_upstream_retries", "Upstream requests retried", ["upstream", "reason"])
+UPSTREAM_CONCURRENCY = Gauge(
+    "basedagent_upstream_concurrency", "Adaptive upstream concurrency limit and requests in flight",
+    ["upstream", "kind"], multiprocess_mode="livesum"
+)
+CIRCUIT_STATE = Gauge(
+    "basedagent_circuit_state", "Upstream circuit state: 0 closed, 1 half open, 2 open", ["upstream"],
+    multiprocess_mode="max"
+)
+CIRCUIT_REJECTIONS = Counter(
+    "basedagent_circuit_rejections", "Upstream calls turned away by a circuit breaker or bulkhead", ["upstream", "reason"]
+)
+TOOL_PREFETCHES = Counter(
+    "basedagent_tool_prefetches", "Speculatively prefetched tool calls by outcome", ["tool", "outcome"]
+)
+ENTITY_CACHE_LOOKUPS = Counter(
+    "basedagent_entity_cache_lookups", "User and chat cache lookups by the tier that answered", ["entity", "tier"]
+)
+
+# OpenTelemetry is optional: spans are no-ops unless the SDK and an exporter are configured
+_tracer = trace.get_tracer("basedagent") if trace else None
+
+
+@contextmanager
+def span(component: str, stage: str, **attributes):
+    otel_span = _tracer.start_as_current_span(f"{component}.{stage}", attributes=attributes) if _tracer else nullcontext()
+    start = time.perf_counter()
+    with otel_span:
+        try:
+            yield
+        finally:
+            STAGE_DURATION.labels(component, stage).observe(time.perf_counter() - start)
+
+
+def observe_tool_call(tool_name: str, duration: float, cost: float, failed: bool) -> None:
+    TOOL_DURATION.labels(tool_name, "error" if failed else "ok").observe(duration)
+    if cost:
+        TOOL_COST.labels(tool_name).inc(cost)
+
+
+def observe_tool_prefetch(tool_name: str, outcome: str) -> None:
+    TOOL_PREFETCHES.labels(tool_name, outcome).inc()
+
+
+def observe_llm_usage(purpose: str, prompt_tokens: int, completion_tokens: int) -> None:
+    LLM_TOKENS.labels(purpose, "prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels(purpose, "completion").inc(completion_tokens)
+
+
+def observe_upstream_retry(upstream: str, reason: str) -> None:
+    UPSTREAM_RETRIES.labels(upstream, reason).inc()
+
+
+def set_upstream_concurrency(upstream: str, limit: float, in_flight: int) -> None:
+    UPSTREAM_CONCURRENCY.labels(upstream, "limit").set(int(limit))
+    UPSTREAM_CONCURRENCY.labels(upstream, "in_flight").set(in_flight)
+
+
+def set_circuit_state(upstream: str, state: int) -> None:
+    CIRCUIT_STATE.labels(upstream).set(state)
+
+
+def observe_circuit_rejection(upstream: str, reason: str) -> None:
+    CIRCUIT_REJECTIONS.labels(upstream, reason).inc()
+
+
+def observe_entity_cache(entity: str, tier: str) -> None:
+    ENTITY_CACHE_LOOKUPS.labels(entity, tier).inc()
+
+
+class _StatsCollector:
+    def __init__(self, stats: dict[str, dict[str, float]]):
+        self.stats = stats
+
+    def collect(self):
+        for name, fields in self.stats.items():
+            for field, value in fields.items():
+                yield GaugeMetricFamily(f"basedagent_{name}_{field}", f"{name} {field} from Redis stats", value=value)
+
+
+def render_metrics(stats: dict[str, dict[str, float]]) -> bytes:
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    stats_registry = CollectorRegistry()
+    stats_registry.register(_StatsCollector(stats))
+    return generate_latest(registry) + generate_latest(stats_registry)
+
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
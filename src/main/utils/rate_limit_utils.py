@@ -0,0 +1,61 @@
+from fastapi import Depends, Request
+from starlette.datastructures import MutableHeaders
+
+from dto import AccessData, RateLimitResult
+from exceptions import RateLimitExceededError
+from services import RateLimitService
+from utils.auth_utils import get_access_data
+
+
+def rate_limit(policy: str):
+    async def check_user_rate_limit(request: Request, current_user: AccessData = Depends(get_access_data)) -> None:
+        await _enforce(request, f"user:{current_user.sub}", ("user", policy))
+    return check_user_rate_limit
+
+
+def ip_rate_limit(policy: str):
+    async def check_ip_rate_limit(request: Request) -> None:
+        await _enforce(request, f"ip:{request.client.host if request.client else 'unknown'}", (policy,))
+    return check_ip_rate_limit
+
+
+async def _enforce(request: Request, identity: str, policies: tuple[str, ...]) -> None:
+    result = await RateLimitService.get_instance().check(identity, policies)
+    if result is None:
+        return
+    request.state.rate_limit = result
+    if not result.allowed:
+        raise RateLimitExceededError(f"Rate limit exceeded, retry in {result.retry_after_seconds}s")
+
+
+def rate_limit_headers(result: RateLimitResult) -> dict[str, str]:
+    headers = {
+        "RateLimit-Limit": str(result.limit),
+        "RateLimit-Remaining": str(result.remaining),
+        "RateLimit-Reset": str(result.reset_seconds),
+        "RateLimit-Policy": result.policy,
+    }
+    if not result.allowed:
+        headers["Retry-After"] = str(result.retry_after_seconds)
+    return headers
+
+
+class RateLimitHeadersMiddleware:
+    # plain ASGI so streamed (SSE) responses pass through untouched apart from their start message
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            result = scope.get("state", {}).get("rate_limit")
+            if message["type"] == "http.response.start" and result is not None:
+                headers = MutableHeaders(scope=message)
+                for name, value in rate_limit_headers(result).items():
+                    headers[name] = value
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
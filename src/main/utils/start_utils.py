@@ -6,11 +6,21 @@ import uvicorn
 from fastapi import FastAPI
 
 from .db_helper import DatabaseHelper
-from clients import RedisClient, EmailClient, IndexerClient
-from services import AuthService, UserService, ChatService, NotificationService, IndexerService
+from .logging_utils import setup_logging
+from .wallet_utils import shutdown_signature_pool
+from clients import RedisClient, EmailClient, IndexerClient, OpenAIGovernor
+from services import (
+    AuthService, UserService, ChatService, NotificationService,
+    IndexerService, ChatJobService, ResponseCacheService, MetricsService, EntityCacheService,
+    RateLimitService, IdempotencyService
+)
+from constants import CHAT_WORKER_CONCURRENCY
 from persistence import UserDAO, ChatDAO, MessageDAO
 
 _db_helper: DatabaseHelper | None = None
+_redis_client: RedisClient | None = None
+_indexer_client: IndexerClient | None = None
+_indexer_task: asyncio.Task | None = None
 
 
 @asynccontextmanager
@@ -21,53 +31,107 @@ async def lifespan(app: FastAPI):
     await shutdown()
 
 
-async def startup():
-    global _db_helper
+async def init_services():
+    global _db_helper, _redis_client, _indexer_client
+    setup_logging()
     _db_helper = DatabaseHelper()
-    # await _db_helper.del_schema()
-    await _db_helper.create_schema()
+    await _db_helper.check_schema_version()
 
     user_dao = UserDAO(_db_helper)
     chat_dao = ChatDAO(_db_helper)
     message_dao = MessageDAO(_db_helper)
 
-    redis_client = RedisClient()
+    _redis_client = RedisClient()
     email_client = EmailClient()
 
-    await redis_client.connect()
+    await _redis_client.connect()
+    OpenAIGovernor.initialize()
+
+    NotificationService.initialize(_redis_client)
 
-    NotificationService.initialize(redis_client)
+    EntityCacheService.initialize(user_dao, chat_dao, _redis_client)
+    EntityCacheService.get_instance().start()
 
-    AuthService.initialize(user_dao, email_client, redis_client)
+    AuthService.initialize(user_dao, email_client, _redis_client)
     UserService.initialize(user_dao)
-    ChatService.initialize(chat_dao, message_dao, user_dao, redis_client)
+    ResponseCacheService.initialize(_redis_client)
+    ChatService.initialize(chat_dao, message_dao, user_dao, _redis_client)
+    ChatJobService.initialize(ChatService.get_instance(), _redis_client)
+    MetricsService.initialize(_redis_client)
+    RateLimitService.initialize(_redis_client)
+    IdempotencyService.initialize(_redis_client)
 
-    indexer_client = IndexerClient()
-    IndexerService.initialize(indexer_client, NotificationService.get_instance(), redis_client)
-    asyncio.create_task(IndexerService.get_instance().start_periodic_queries(10))
+    _indexer_client = IndexerClient()
+    IndexerService.initialize(_indexer_client, NotificationService.get_instance(), _redis_client)
+
+
+async def startup():
+    global _indexer_task
+    await init_services()
+    if os.getenv("INDEXER_EMBEDDED", "true").lower() == "true":
+        _indexer_task = asyncio.create_task(
+            IndexerService.get_instance().start_periodic_queries(get_indexer_interval())
+        )
 
 
 async def shutdown():
-    global _db_helper
+    global _db_helper, _redis_client, _indexer_client, _indexer_task
+    if _indexer_task is not None:
+        await IndexerService.get_instance().stop_periodic_queries()
+        _indexer_task.cancel()
+        _indexer_task = None
+    if _indexer_client is not None:
+        await _indexer_client.close()
+        _indexer_client = None
+    await OpenAIGovernor.close()
+    if _redis_client is not None:
+        await EntityCacheService.get_instance().stop()
+        await _redis_client.disconnect()
+        _redis_client = None
     if _db_helper is not None:
         await _db_helper.close()
         _db_helper = None
+    shutdown_signature_pool()
+
+
+def get_indexer_interval() -> int:
+    return int(os.getenv("INDEXER_INTERVAL_SECONDS", 10))
 
 
-async def run_app(app_name: str = "app"):
+def run_app(app_name: str = "app"):
     load_dotenv()
     host = os.getenv("APP_HOST", "0.0.0.0")
     port = int(os.getenv("APP_PORT", 8000))
     workers = int(os.getenv("APP_WORKERS", 1))
-    
-    config = uvicorn.Config(
-        app=f"main:{app_name}",
+
+    # uvicorn only forks worker processes when started through uvicorn.run;
+    # Server.serve() always runs a single in-process server.
+    uvicorn.run(
+        f"main:{app_name}",
         host=host,
         port=port,
         workers=workers,
         reload=True if os.getenv("ENVIRONMENT") == "development" else False,
         log_level="info"
     )
-    
-    server = uvicorn.Server(config)
-    await server.serve()
+
+
+async def run_indexer():
+    load_dotenv()
+    await init_services()
+    indexer_service = IndexerService.get_instance()
+    try:
+        await indexer_service.start_periodic_queries(get_indexer_interval())
+    finally:
+        await indexer_service.stop_periodic_queries()
+        await shutdown()
+
+
+async def run_chat_worker():
+    load_dotenv()
+    await init_services()
+    concurrency = int(os.getenv("CHAT_WORKER_CONCURRENCY", CHAT_WORKER_CONCURRENCY))
+    try:
+        await ChatJobService.get_instance().run_worker(concurrency)
+    finally:
+        await shutdown()
@@ -1,7 +1,15 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 from eth_account import Account
 from eth_account.messages import encode_defunct
+from constants import SIGNATURE_POOL_WORKERS
 from exceptions import WalletVerificationError
 
+_signature_pool: ProcessPoolExecutor | None = None
+
 
 def verify_signature(wallet_address: str, message: str, signature: str) -> bool:
     try:
@@ -18,6 +26,26 @@ def verify_signature(wallet_address: str, message: str, signature: str) -> bool:
         raise WalletVerificationError(f"Failed to verify signature: {str(e)}")
 
 
+async def verify_signature_async(wallet_address: str, message: str, signature: str) -> bool:
+    # keccak + ECDSA recovery is pure Python and holds the event loop for milliseconds
+    global _signature_pool
+    if _signature_pool is None:
+        _signature_pool = ProcessPoolExecutor(
+            max_workers=int(os.getenv("SIGNATURE_POOL_WORKERS", SIGNATURE_POOL_WORKERS)),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return await asyncio.get_running_loop().run_in_executor(
+        _signature_pool, verify_signature, wallet_address, message, signature
+    )
+
+
+def shutdown_signature_pool() -> None:
+    global _signature_pool
+    if _signature_pool is not None:
+        _signature_pool.shutdown(wait=False, cancel_futures=True)
+        _signature_pool = None
+
+
 def is_valid_ethereum_address(address: str) -> bool:
     try:
         if not address.startswith('0x') or len(address) != 42: